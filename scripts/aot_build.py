@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+"""
+Ahead-of-time build of the backtest kernels.
+
+Compiles the kernels from ``trading_bot._kernels`` into a native extension
+module ``trading_bot/_trading_kernels`` (``.so`` / ``.pyd``) with
+``numba.pycc``. When that module is present, ``trading_bot._kernels`` uses it
+directly and no JIT compilation happens at start-up, which matters for short
+CLI runs such as ``python app.py --mode backtest --limit 200``.
+
+Numba is only needed to run this script, not to use the built module::
+
+    python scripts/aot_build.py
+
+Re-run it after changing any kernel; the JIT path is used whenever the
+extension is missing.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+# Build from the Python sources, never from a previously built extension
+os.environ["TRADING_BOT_NO_AOT"] = "1"
+
+from numba.pycc import CC  # noqa: E402
+
+from trading_bot import _kernels  # noqa: E402
+
+_SINGLE = "Tuple((i8[:], i1[:], f8[:], f8[:], f8, f8))(f8[:], f8[:], f8[:], f8[:])"
+_BATCH = "Tuple((i8[:, :], i1[:, :], f8[:, :], i8[:], f8[:, :], f8[:], f8[:]))(f8[:], f8[:], f8[:], f8[:, :])"
+_GRID = "f8[:, :](f8[:], f8[:], f8[:], i8[:], f8[:, :], f8)"
+
+
+def main() -> None:
+    cc = CC("_trading_kernels")
+    cc.output_dir = os.path.join(ROOT, "trading_bot")
+    cc.verbose = True
+    for name in _kernels.KERNEL_NAMES:
+        # Exported functions are compiled without ``parallel=True`` (pycc does
+        # not support it), so ``prange`` in the batch kernels runs serially.
+        cc.export(f"run_{name}", _SINGLE)(getattr(_kernels, f"_run_{name}").py_func)
+        cc.export(f"run_{name}_batch", _BATCH)(getattr(_kernels, f"_run_{name}_batch").py_func)
+        cc.export(f"run_{name}_grid", _GRID)(getattr(_kernels, f"_run_{name}_grid").py_func)
+    cc.compile()
+    print(f"built {cc.output_file} in {cc.output_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""The compiled kernels must trade exactly like the per-bar ``step`` path."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from trading_bot import _kernels, optimizer
+from trading_bot.backtest import run_backtest_multi
+from trading_bot.cli import default_choices
+from trading_bot.optimizer import grid_search_one
+from trading_bot.strategies import BollingerReversion, DonchianBreakout, MACDRSI, SMACross
+
+pytestmark = pytest.mark.skipif(not _kernels.HAVE_KERNELS, reason="needs numba or the AOT kernels")
+
+
+def _bars(n: int, seed: int, drift: float = 0.0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(drift, 0.004, n)))
+    open_ = np.r_[close[0], close[:-1]]
+    high = np.maximum(open_, close) * (1 + np.abs(rng.normal(0, 0.001, n)))
+    low = np.minimum(open_, close) * (1 - np.abs(rng.normal(0, 0.001, n)))
+    index = pd.date_range("2025-01-01", periods=n, freq="1min", tz="UTC")
+    return pd.DataFrame(
+        {"open": open_, "high": high, "low": low, "close": close, "volume": rng.uniform(1, 10, n)},
+        index=index,
+    )
+
+
+def _both_paths(monkeypatch, fn):
+    optimizer._GRID_CACHE.clear()
+    kernel = fn()
+    optimizer._GRID_CACHE.clear()
+    with monkeypatch.context() as m:
+        m.setattr(_kernels, "HAVE_KERNELS", False)
+        stepped = fn()
+    optimizer._GRID_CACHE.clear()
+    return kernel, stepped
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+@pytest.mark.parametrize("dtype", ["float64", "float32"])
+def test_backtest_trades_match(monkeypatch, seed, dtype):
+    df = _bars(800, seed)
+    if dtype == "float32":
+        df = df.astype(np.float32)
+    kernel, stepped = _both_paths(monkeypatch, lambda: run_backtest_multi(df, default_choices()))
+    for k, s in zip(kernel, stepped):
+        n = k._ntrades
+        assert n == s._ntrades > 0, k.name
+        np.testing.assert_array_equal(k.trade_ts[:n], s.trade_ts[:n])
+        np.testing.assert_array_equal(k.trade_side[:n], s.trade_side[:n])
+        np.testing.assert_allclose(k.trade_price[:n], s.trade_price[:n], rtol=1e-12)
+        np.testing.assert_allclose(k.trade_qty[:n], s.trade_qty[:n], rtol=1e-9)
+
+
+@pytest.mark.parametrize("Cls", [MACDRSI, SMACross, DonchianBreakout, BollingerReversion])
+def test_grid_search_winner_matches(monkeypatch, Cls):
+    df = _bars(300, 3, drift=0.001)
+    (k_params, k_metrics), (s_params, s_metrics) = _both_paths(
+        monkeypatch, lambda: grid_search_one(df, Cls, min_trades=1, max_dd_cap=1.0, max_workers=1)
+    )
+    assert k_params == s_params
+    assert k_metrics["trades"] == s_metrics["trades"]
+    for key in ("cagr", "max_dd", "sharpe"):
+        assert k_metrics[key] == pytest.approx(s_metrics[key], rel=1e-9, abs=1e-12)
@@ -9,12 +9,12 @@ live trading loops. Importing this package makes it easy to access the
 components directly, e.g. ``from trading_bot import MACDRSI``.
 """
 
-from .data import fetch_klines, stream_latest_close
+from .data import fetch_klines, fetch_klines_since, stream_latest_close, KlineStream
 from .indicators import rsi, macd, sma, atr
 from .base_strategy import StrategyBase
 from .strategies import MACDRSI, SMACross, DonchianBreakout, BollingerReversion
 from .optimizer import score_metrics, grid_search_one
-from .backtest import run_backtest_multi
+from .backtest import run_backtest_multi, run_backtest_symbols
 from .plotting import plot_with_numbered_trades
 from .viewer import interactive_backtest_viewer
 from .broker import BinanceBroker
@@ -22,7 +22,9 @@ from .live import run_live
 
 __all__ = [
     "fetch_klines",
+    "fetch_klines_since",
     "stream_latest_close",
+    "KlineStream",
     "rsi",
     "macd",
     "sma",
@@ -34,6 +36,7 @@ __all__ = [
     "score_metrics",
     "grid_search_one",
     "run_backtest_multi",
+    "run_backtest_symbols",
     "plot_with_numbered_trades",
     "interactive_backtest_viewer",
     "BinanceBroker",
@@ -0,0 +1,927 @@
+"""
+Compiled backtest kernels for the built-in strategies.
+
+The functions in this module run an entire backtest bar loop over plain
+NumPy arrays: indicator recurrences, signal rules, and trade bookkeeping.
+They are compiled with Numba when it is installed. Without Numba the
+``njit`` decorator below is a no-op so the package still imports, and
+:data:`HAVE_KERNELS` tells callers to use the regular per-bar
+:meth:`~trading_bot.base_strategy.StrategyBase.step` path instead.
+
+If ``scripts/aot_build.py`` has been run, the ahead-of-time compiled
+extension ``trading_bot._trading_kernels`` is preferred for the strategy
+kernels: it needs neither Numba nor any JIT compilation on first use. Set
+``TRADING_BOT_NO_AOT=1`` to ignore it.
+
+Indicator kernels use exactly the same recurrences (and operation order)
+as the incremental state objects in :mod:`trading_bot.indicators`, so both
+paths produce identical trades.
+
+Price arrays may be float32 or float64. Either way every running sum,
+indicator series and account value is carried in float64; float32 input
+only halves the memory streamed per bar. The AOT extension is built for
+float64 only, so float32 input is widened before calling it.
+"""
+
+from __future__ import annotations
+
+import math
+import os
+
+import numpy as np
+
+try:
+    from numba import njit, prange
+
+    HAVE_NUMBA = True
+except ImportError:  # pragma: no cover - exercised only without numba
+    HAVE_NUMBA = False
+    prange = range
+
+    def njit(*args, **kwargs):  # type: ignore[no-redef]
+        """Fallback decorator used when Numba is not installed."""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+
+        def wrap(fn):
+            return fn
+
+        return wrap
+
+
+__all__ = [
+    "HAVE_NUMBA",
+    "HAVE_AOT",
+    "HAVE_KERNELS",
+    "SIG_NONE",
+    "SIG_BUY",
+    "SIG_SELL",
+    "KERNEL_NAMES",
+    "run_macdrsi",
+    "run_smacross",
+    "run_donchian",
+    "run_bollinger",
+    "run_macdrsi_batch",
+    "run_smacross_batch",
+    "run_donchian_batch",
+    "run_bollinger_batch",
+    "run_macdrsi_grid",
+    "run_smacross_grid",
+    "run_donchian_grid",
+    "run_bollinger_grid",
+    "run_batch",
+    "run_grid",
+    "GRID_METRICS",
+    "warm_up",
+    "start_threads",
+]
+
+SIG_NONE = 0
+SIG_BUY = 1
+SIG_SELL = -1
+
+
+# ---------------------------------------------------------------------------
+# Indicator kernels
+# ---------------------------------------------------------------------------
+
+
+@njit(cache=True)
+def _sma_kernel(x, window):
+    n = x.shape[0]
+    out = np.empty(n)
+    buf = np.empty(window)
+    total = 0.0
+    for i in range(n):
+        total += x[i]
+        if i >= window:
+            total -= buf[i % window]
+        buf[i % window] = x[i]
+        out[i] = total / window if i + 1 >= window else np.nan
+    return out
+
+
+@njit(cache=True)
+def _ema_kernel(x, span):
+    n = x.shape[0]
+    out = np.empty(n)
+    a = 1.0 / (1.0 + (span - 1) / 2.0)
+    value = x[0] if n > 0 else np.nan
+    for i in range(n):
+        if i > 0:
+            value = (1.0 - a) * value + a * x[i]
+        out[i] = value
+    return out
+
+
+@njit(cache=True)
+def _macd_kernel(closes, fast, slow, signal):
+    macd_line = _ema_kernel(closes, fast) - _ema_kernel(closes, slow)
+    signal_line = _ema_kernel(macd_line, signal)
+    return macd_line, signal_line, macd_line - signal_line
+
+
+@njit(cache=True)
+def _rsi_kernel(closes, period):
+    n = closes.shape[0]
+    out = np.empty(n)
+    if n == 0:
+        return out
+    gains = np.zeros(n - 1)
+    losses = np.zeros(n - 1)
+    for i in range(1, n):
+        delta = closes[i] - closes[i - 1]
+        gains[i - 1] = max(delta, 0.0)
+        losses[i - 1] = max(-delta, 0.0)
+    avg_gain = _sma_kernel(gains, period)
+    avg_loss = _sma_kernel(losses, period)
+    out[0] = np.nan
+    for i in range(1, n):
+        g = avg_gain[i - 1]
+        l = avg_loss[i - 1]
+        if l == 0.0:
+            out[i] = 100.0 if g > 0.0 else np.nan
+        else:
+            out[i] = 100.0 - 100.0 / (1.0 + g / l)
+    return out
+
+
+@njit(cache=True)
+def _atr_kernel(highs, lows, closes, period):
+    n = closes.shape[0]
+    tr = np.empty(n)
+    for i in range(n):
+        t = highs[i] - lows[i]
+        if i > 0:
+            pc = closes[i - 1]
+            t = max(t, abs(highs[i] - pc), abs(lows[i] - pc))
+        tr[i] = t
+    return _sma_kernel(tr, period)
+
+
+@njit(cache=True)
+def _rolling_std_kernel(x, window):
+    n = x.shape[0]
+    out = np.empty(n)
+    if n == 0:
+        return out
+    shift = np.float64(x[0])
+    buf = np.empty(window)
+    total = 0.0
+    total_sq = 0.0
+    for i in range(n):
+        d = x[i] - shift
+        total += d
+        total_sq += d * d
+        if i >= window:
+            old = buf[i % window]
+            total -= old
+            total_sq -= old * old
+        buf[i % window] = d
+        if i + 1 < window:
+            out[i] = np.nan
+        else:
+            mean = total / window
+            out[i] = math.sqrt(max(total_sq / window - mean * mean, 0.0))
+    return out
+
+
+@njit(cache=True)
+def _rolling_max_deque(x, window):
+    # Monotonic deque stored in a flat index array (head/tail pointers).
+    n = x.shape[0]
+    out = np.empty(n)
+    q = np.empty(n, dtype=np.int64)
+    head = 0
+    tail = 0
+    for i in range(n):
+        while tail > head and x[q[tail - 1]] <= x[i]:
+            tail -= 1
+        q[tail] = i
+        tail += 1
+        if q[head] <= i - window:
+            head += 1
+        out[i] = x[q[head]] if i + 1 >= window else np.nan
+    return out
+
+
+@njit(cache=True)
+def _rolling_min_deque(x, window):
+    n = x.shape[0]
+    out = np.empty(n)
+    q = np.empty(n, dtype=np.int64)
+    head = 0
+    tail = 0
+    for i in range(n):
+        while tail > head and x[q[tail - 1]] >= x[i]:
+            tail -= 1
+        q[tail] = i
+        tail += 1
+        if q[head] <= i - window:
+            head += 1
+        out[i] = x[q[head]] if i + 1 >= window else np.nan
+    return out
+
+
+@njit(cache=True)
+def _rolling_max_kernel(x, window):
+    # Van Herk/Gil-Werman: running maxima forwards (g) and backwards (h)
+    # within each block of ``window`` bars; every window then spans at most
+    # two blocks, so its maximum is max(h[start], g[end]). Unlike the deque
+    # there are no data-dependent branches, so the loops vectorise and do
+    # not mispredict on noisy prices. NaN input keeps the deque's semantics.
+    n = x.shape[0]
+    if np.isnan(x).any():
+        return _rolling_max_deque(x, window)
+    out = np.empty(n)
+    g = np.empty(n)
+    h = np.empty(n)
+    for s in range(0, n, window):
+        e = min(s + window, n)
+        g[s] = x[s]
+        for i in range(s + 1, e):
+            g[i] = max(g[i - 1], x[i])
+        h[e - 1] = x[e - 1]
+        for i in range(e - 2, s - 1, -1):
+            h[i] = max(h[i + 1], x[i])
+    for i in range(min(window - 1, n)):
+        out[i] = np.nan
+    for i in range(window - 1, n):
+        out[i] = max(h[i - window + 1], g[i])
+    return out
+
+
+@njit(cache=True)
+def _rolling_min_kernel(x, window):
+    n = x.shape[0]
+    if np.isnan(x).any():
+        return _rolling_min_deque(x, window)
+    out = np.empty(n)
+    g = np.empty(n)
+    h = np.empty(n)
+    for s in range(0, n, window):
+        e = min(s + window, n)
+        g[s] = x[s]
+        for i in range(s + 1, e):
+            g[i] = min(g[i - 1], x[i])
+        h[e - 1] = x[e - 1]
+        for i in range(e - 2, s - 1, -1):
+            h[i] = min(h[i + 1], x[i])
+    for i in range(min(window - 1, n)):
+        out[i] = np.nan
+    for i in range(window - 1, n):
+        out[i] = min(h[i - window + 1], g[i])
+    return out
+
+
+# ---------------------------------------------------------------------------
+# Bar loop helpers
+# ---------------------------------------------------------------------------
+
+
+@njit(cache=True)
+def _execute(sig, price, fee, cash, position):
+    """Apply a signal to (cash, position) exactly like ``StrategyBase.step``.
+
+    Returns ``(cash, position, qty)`` where ``qty`` is non-zero only if a
+    trade was actually executed.
+    """
+    if sig == SIG_BUY and position == 0:
+        qty = cash / (price * (1 + fee))
+        if qty > 1e-9:
+            cash -= qty * price * (1 + fee)
+            return cash, qty, qty
+    elif sig == SIG_SELL and position > 0:
+        qty = position
+        cash += qty * price * (1 - fee)
+        return cash, 0.0, qty
+    return cash, position, 0.0
+
+
+@njit(cache=True)
+def _trade_buffers(n):
+    return np.empty(n, dtype=np.int64), np.empty(n, dtype=np.int8), np.empty(n)
+
+
+# ---------------------------------------------------------------------------
+# Strategy kernels
+# ---------------------------------------------------------------------------
+#
+# Each strategy is split into an indicator pass, whose ``[F, N]`` table of
+# precomputed series is filled row by row by ``_slot_<name>``, and a per-bar
+# rule, ``_decide_<name>(i, price, position, ind, st, p)``, which returns a
+# SIG_* code. ``st`` is a small float64 scratch array holding the strategy's own
+# state between bars (entry high, trailing stop, ...). ``_bar_loop`` is the
+# shared bar loop that applies the signals and records trades.
+#
+# The rules read ``st`` and every ``p`` entry they need up front and write
+# ``st`` back once at the end. Touching those arrays only inside branches
+# makes Numba refcount them on every bar, which costs more than the rule.
+# For the same reason the entry/exit conditions combine their comparisons
+# with ``&``/``|`` rather than ``and``/``or``: the comparisons are cheap and
+# side-effect free, and evaluating all of them leaves one branch per rule
+# instead of a chain of hard-to-predict ones.
+#
+# All strategy kernels share the signature ``(highs, lows, closes, p)`` where
+# ``p`` is a float64 parameter vector laid out as documented on each kernel
+# (window lengths are stored as floats and converted back with ``int``); the
+# last two entries are always ``fee`` and ``start_cash``. Each returns
+# ``(trade_idx, trade_side, trade_qty, equity, cash, position)``: bar
+# indices, sides (+1 BUY / -1 SELL) and quantities of the executed trades,
+# the per-bar equity curve, and the final account state.
+
+KIND_MACDRSI = 0
+KIND_SMACROSS = 1
+KIND_DONCHIAN = 2
+KIND_BOLLINGER = 3
+
+STATE_SIZE = 1
+
+# Each strategy's indicator table has one row ("slot") per indicator, built
+# by ``_slot_<name>(f, ...)``. _SLOT_COLS[kind, f] lists the parameter
+# columns slot f depends on (-1 padded), so grid rows that agree on those
+# columns can share the slot; _N_SLOTS[kind] is the table height.
+_N_SLOTS = np.array([2, 2, 3, 4], dtype=np.int64)
+_SLOT_COLS = np.array(
+    [
+        [[0, 1, 2], [3, -1, -1], [-1, -1, -1], [-1, -1, -1]],
+        [[0, 1, -1], [2, -1, -1], [-1, -1, -1], [-1, -1, -1]],
+        [[0, -1, -1], [1, -1, -1], [2, -1, -1], [-1, -1, -1]],
+        [[0, -1, -1], [0, -1, -1], [2, -1, -1], [5, -1, -1]],
+    ],
+    dtype=np.int64,
+)
+
+
+@njit(cache=True)
+def _slot_macdrsi(f, highs, lows, closes, p):
+    # p = (macd_fast, macd_slow, macd_signal, rsi_period, rsi_buy, rsi_sell,
+    #      trail_pct, fee, start_cash); slots: [macd histogram, rsi]
+    if f == 0:
+        return _macd_kernel(closes, int(p[0]), int(p[1]), int(p[2]))[2]
+    return _rsi_kernel(closes, int(p[3]))
+
+
+@njit(cache=True)
+def _decide_macdrsi(i, price, position, ind, st, p):
+    # st[0]: high since entry (-inf = unset)
+    rsi_buy, rsi_sell, trail_pct = p[4], p[5], p[6]
+    high = st[0]
+    sig = SIG_NONE
+    if i + 1 >= 3:
+        md_now = ind[0, i]
+        md_prev = ind[0, i - 1]
+        r = ind[1, i]
+        if position > 0:
+            high = price if price > high else high
+            trail_stop = high * (1 - trail_pct)
+            if ((md_now < 0) & (md_prev > 0)) | (r >= rsi_sell) | (price <= trail_stop):
+                high = -np.inf
+                sig = SIG_SELL
+        elif (md_now > 0) & (md_prev < 0) & (r >= rsi_buy):
+            high = price
+            sig = SIG_BUY
+    st[0] = high
+    return sig
+
+
+@njit(cache=True)
+def _slot_smacross(f, highs, lows, closes, p):
+    # p = (fast, slow, rsi_period, rsi_filter, trail_pct, fee, start_cash);
+    # slots: [sma fast - sma slow, rsi]
+    if f == 0:
+        return _sma_kernel(closes, int(p[0])) - _sma_kernel(closes, int(p[1]))
+    return _rsi_kernel(closes, int(p[2]))
+
+
+@njit(cache=True)
+def _decide_smacross(i, price, position, ind, st, p):
+    # st[0]: high since entry (-inf = unset)
+    warm_up = max(int(p[0]), int(p[1])) + 2
+    rsi_filter, trail_pct = p[3], p[4]
+    high = st[0]
+    sig = SIG_NONE
+    if i + 1 >= warm_up:
+        c_now = ind[0, i]
+        c_prev = ind[0, i - 1]
+        r = ind[1, i]
+        if position > 0:
+            high = price if price > high else high
+            if (price <= high * (1 - trail_pct)) | ((c_now < 0) & (c_prev > 0)) | (r > 70):
+                high = -np.inf
+                sig = SIG_SELL
+        elif (c_now > 0) & (c_prev < 0) & (r >= rsi_filter):
+            high = price
+            sig = SIG_BUY
+    st[0] = high
+    return sig
+
+
+@njit(cache=True)
+def _slot_donchian(f, highs, lows, closes, p):
+    # p = (ch, exit_ch, atr_n, atr_mult, fee, start_cash);
+    # slots: [channel high, exit low, atr]
+    if f == 0:
+        return _rolling_max_kernel(highs, int(p[0]))
+    if f == 1:
+        return _rolling_min_kernel(lows, int(p[1]))
+    return _atr_kernel(highs, lows, closes, int(p[2]))
+
+
+@njit(cache=True)
+def _decide_donchian(i, price, position, ind, st, p):
+    # st[0]: trailing stop. Mirrors ``self.trailing or -inf``: None and 0.0
+    # both fall back to -inf, anything else (including NaN) is kept.
+    warm_up = max(int(p[0]), int(p[1])) + 2
+    atr_mult = p[3]
+    trailing = st[0]
+    sig = SIG_NONE
+    if i + 1 >= warm_up:
+        if position == 0:
+            if price > ind[0, i - 1]:
+                trailing = price - atr_mult * ind[2, i]
+                sig = SIG_BUY
+        else:
+            base = trailing if trailing != 0.0 else -np.inf
+            t = price - atr_mult * ind[2, i]
+            trailing = t if t > base else base
+            if (price < ind[1, i]) | (price < trailing):
+                trailing = 0.0
+                sig = SIG_SELL
+    st[0] = trailing
+    return sig
+
+
+@njit(cache=True)
+def _slot_bollinger(f, highs, lows, closes, p):
+    # p = (bb_period, bb_dev, rsi_period, rsi_buy, rsi_exit, atr_n, atr_mult,
+    #      fee, start_cash); slots: [mid, std, rsi, atr]
+    if f == 0:
+        return _sma_kernel(closes, int(p[0]))
+    if f == 1:
+        return _rolling_std_kernel(closes, int(p[0]))
+    if f == 2:
+        return _rsi_kernel(closes, int(p[2]))
+    return _atr_kernel(highs, lows, closes, int(p[5]))
+
+
+@njit(cache=True)
+def _decide_bollinger(i, price, position, ind, st, p):
+    # st[0]: protective stop price (NaN = no stop, never triggers)
+    warm_up = max(int(p[0]), int(p[2]), int(p[5])) + 2
+    bb_dev, rsi_buy, rsi_exit, atr_mult = p[1], p[3], p[4], p[6]
+    stop = st[0]
+    sig = SIG_NONE
+    if i + 1 >= warm_up:
+        mid = ind[0, i]
+        r = ind[2, i]
+        if position > 0:
+            if (price <= stop) | (price >= mid) | (r >= rsi_exit):
+                stop = np.nan
+                sig = SIG_SELL
+        elif (price <= mid - bb_dev * ind[1, i]) & (r <= rsi_buy):
+            stop = price - atr_mult * ind[3, i]
+            sig = SIG_BUY
+    st[0] = stop
+    return sig
+
+
+@njit(cache=True)
+def _slot(kind, f, highs, lows, closes, p):
+    if kind == KIND_MACDRSI:
+        return _slot_macdrsi(f, highs, lows, closes, p)
+    if kind == KIND_SMACROSS:
+        return _slot_smacross(f, highs, lows, closes, p)
+    if kind == KIND_DONCHIAN:
+        return _slot_donchian(f, highs, lows, closes, p)
+    return _slot_bollinger(f, highs, lows, closes, p)
+
+
+@njit(cache=True)
+def _indicators(kind, highs, lows, closes, p):
+    ind = np.empty((_N_SLOTS[kind], closes.shape[0]))
+    for f in range(_N_SLOTS[kind]):
+        ind[f] = _slot(kind, f, highs, lows, closes, p)
+    return ind
+
+
+@njit(cache=True, inline="always")
+def _bar_loop(decide, closes, ind, p, st0, dd_cap):
+    # ``decide`` is one of the _decide_<name> kernels; passing it as an
+    # argument compiles a separate loop per strategy with the rule inlined,
+    # instead of branching on the kind (and refcounting the arrays) per bar.
+    # Inlined into _simulate so the function value is never passed at run
+    # time, which would stop Numba from caching the caller.
+    #
+    # The loop stops after the first bar whose drawdown from the running
+    # equity peak exceeds ``dd_cap`` (np.inf: never), and the outputs end
+    # there. Drawdown never shrinks, so such a run fails the cap anyway.
+    n = closes.shape[0]
+    fee = p[p.shape[0] - 2]
+    t_idx, t_side, t_qty = _trade_buffers(n)
+    equity = np.empty(n)
+    st = np.full(STATE_SIZE, st0)
+    nt = 0
+    cash = p[p.shape[0] - 1]
+    position = 0.0
+    peak = -np.inf
+    end = n
+    for i in range(n):
+        price = closes[i]
+        sig = decide(i, price, position, ind, st, p)
+        cash, position, qty = _execute(sig, price, fee, cash, position)
+        if qty != 0.0:
+            t_idx[nt] = i
+            t_side[nt] = sig
+            t_qty[nt] = qty
+            nt += 1
+        eq = cash + position * price
+        equity[i] = eq
+        # Same peak/drawdown arithmetic as _metrics_kernel
+        if eq > peak:
+            peak = eq
+        elif peak > 0 and (peak - eq) / peak > dd_cap:
+            end = i + 1
+            break
+    return t_idx[:nt], t_side[:nt], t_qty[:nt], equity[:end], cash, position
+
+
+@njit(cache=True)
+def _simulate(kind, closes, ind, p, dd_cap):
+    if kind == KIND_MACDRSI:
+        return _bar_loop(_decide_macdrsi, closes, ind, p, -np.inf, dd_cap)
+    if kind == KIND_SMACROSS:
+        return _bar_loop(_decide_smacross, closes, ind, p, -np.inf, dd_cap)
+    if kind == KIND_DONCHIAN:
+        return _bar_loop(_decide_donchian, closes, ind, p, 0.0, dd_cap)
+    return _bar_loop(_decide_bollinger, closes, ind, p, np.nan, dd_cap)
+
+
+@njit(cache=True)
+def _run(kind, highs, lows, closes, p):
+    return _simulate(kind, closes, _indicators(kind, highs, lows, closes, p), p, np.inf)
+
+
+@njit(cache=True)
+def _run_macdrsi(highs, lows, closes, p):
+    return _run(KIND_MACDRSI, highs, lows, closes, p)
+
+
+@njit(cache=True)
+def _run_smacross(highs, lows, closes, p):
+    return _run(KIND_SMACROSS, highs, lows, closes, p)
+
+
+@njit(cache=True)
+def _run_donchian(highs, lows, closes, p):
+    return _run(KIND_DONCHIAN, highs, lows, closes, p)
+
+
+@njit(cache=True)
+def _run_bollinger(highs, lows, closes, p):
+    return _run(KIND_BOLLINGER, highs, lows, closes, p)
+
+
+# ---------------------------------------------------------------------------
+# Batched kernels
+# ---------------------------------------------------------------------------
+#
+# Run K independent parameter sets of one strategy over the same bars, one
+# ``prange`` iteration per row of ``params[K, P]``. Every iteration writes
+# only its own row of the pre-sized outputs, so there are no data races.
+# Returns ``(trade_idx[K, N], trade_side[K, N], trade_qty[K, N],
+# trade_count[K], equity[K, N], cash[K], position[K])``; row ``k`` of the
+# trade arrays is valid up to ``trade_count[k]``.
+
+
+@njit(cache=True)
+def _batch_alloc(k, n):
+    return (
+        np.empty((k, n), dtype=np.int64),
+        np.empty((k, n), dtype=np.int8),
+        np.empty((k, n)),
+        np.empty(k, dtype=np.int64),
+        np.empty((k, n)),
+        np.empty(k),
+        np.empty(k),
+    )
+
+
+@njit(cache=True)
+def _batch_store(out, k, res):
+    t_idx, t_side, t_qty, counts, equity, cash, position = out
+    m = res[0].shape[0]
+    t_idx[k, :m] = res[0]
+    t_side[k, :m] = res[1]
+    t_qty[k, :m] = res[2]
+    counts[k] = m
+    equity[k, :] = res[3]
+    cash[k] = res[4]
+    position[k] = res[5]
+
+
+@njit(cache=True, parallel=True)
+def _run_macdrsi_batch(highs, lows, closes, params):
+    out = _batch_alloc(params.shape[0], closes.shape[0])
+    for k in prange(params.shape[0]):
+        _batch_store(out, k, _run_macdrsi(highs, lows, closes, params[k]))
+    return out
+
+
+@njit(cache=True, parallel=True)
+def _run_smacross_batch(highs, lows, closes, params):
+    out = _batch_alloc(params.shape[0], closes.shape[0])
+    for k in prange(params.shape[0]):
+        _batch_store(out, k, _run_smacross(highs, lows, closes, params[k]))
+    return out
+
+
+@njit(cache=True, parallel=True)
+def _run_donchian_batch(highs, lows, closes, params):
+    out = _batch_alloc(params.shape[0], closes.shape[0])
+    for k in prange(params.shape[0]):
+        _batch_store(out, k, _run_donchian(highs, lows, closes, params[k]))
+    return out
+
+
+@njit(cache=True, parallel=True)
+def _run_bollinger_batch(highs, lows, closes, params):
+    out = _batch_alloc(params.shape[0], closes.shape[0])
+    for k in prange(params.shape[0]):
+        _batch_store(out, k, _run_bollinger(highs, lows, closes, params[k]))
+    return out
+
+
+# ---------------------------------------------------------------------------
+# Grid kernels
+# ---------------------------------------------------------------------------
+#
+# Like the batched kernels, but each parameter set is reduced to its
+# performance metrics inside the kernel, so a whole optimisation grid comes
+# back as one ``metrics[K, len(GRID_METRICS)]`` array instead of K equity
+# curves. ``ts_ns`` holds the bar timestamps as int64 ns since the epoch.
+#
+# Grid rows mostly differ in thresholds rather than indicator lengths, so
+# each distinct indicator slot is computed once per grid (e.g. 30 arrays
+# instead of 2 x 2187 for the MACD/RSI grid) and shared by every row that
+# needs it.
+
+GRID_METRICS = ("final_equity", "pnl", "sharpe", "max_dd", "trades", "winrate", "cagr", "days")
+
+
+@njit(cache=True)
+def _metrics_kernel(ts_ns, closes, res, out):
+    # Mirrors StrategyBase.metrics() on the kernel's raw outputs.
+    t_idx, t_side, t_qty, equity, cash, position = res
+    n = equity.shape[0]
+    nt = t_idx.shape[0]
+    first = -1
+    m = 0
+    for i in range(n):
+        if equity[i] == equity[i]:
+            if first < 0:
+                first = i
+            m += 1
+    out[:] = np.nan
+    out[4] = nt
+    if m == 0:
+        return
+    vals = np.empty(m)
+    j = 0
+    for i in range(n):
+        if equity[i] == equity[i]:
+            vals[j] = equity[i]
+            j += 1
+    days = max((ts_ns[n - 1] - ts_ns[first]) / 1e9 / 86400.0, 1e-9)
+    # Per-bar returns (pct_change with the leading/undefined values as 0)
+    ret = np.zeros(m)
+    for i in range(1, m):
+        r = vals[i] / vals[i - 1] - 1.0
+        ret[i] = r if r == r else 0.0
+    mu = ret.mean()
+    sigma = 0.0
+    if m > 1:
+        ss = 0.0
+        for i in range(m):
+            ss += (ret[i] - mu) ** 2
+        sigma = math.sqrt(ss / (m - 1))
+    sharpe = (mu / sigma) * math.sqrt(1440) if sigma > 0 else 0.0
+    peak = -np.inf
+    max_dd = 0.0
+    for i in range(m):
+        if vals[i] > peak:
+            peak = vals[i]
+        if peak > 0:
+            dd = (peak - vals[i]) / peak
+            if dd > max_dd:
+                max_dd = dd
+    start_eq = vals[0]
+    end_eq = vals[m - 1]
+    years = days / 365.0
+    cagr = (end_eq / start_eq) ** (1.0 / max(years, 1e-9)) - 1.0 if start_eq > 0 else 0.0
+    npairs = nt // 2
+    wins = 0
+    for q in range(npairs):
+        if (closes[t_idx[2 * q + 1]] - closes[t_idx[2 * q]]) * t_qty[2 * q] > 0:
+            wins += 1
+    out[0] = end_eq
+    out[1] = end_eq - start_eq
+    out[2] = sharpe
+    out[3] = max_dd
+    out[5] = wins / max(1, npairs)
+    out[6] = cagr
+    out[7] = days
+
+
+@njit(cache=True)
+def _grid_slots(kind, params):
+    # Deduplicate the indicator slots of a grid. Returns (src_f, src_k, rows):
+    # distinct slot t is slot src_f[t] computed with params[src_k[t]], and
+    # grid row k reads its slot f from distinct slot rows[k, f]. A linear
+    # scan per row is plenty for the handful of distinct lengths in a grid.
+    k_rows = params.shape[0]
+    n_slots = _N_SLOTS[kind]
+    rows = np.empty((k_rows, n_slots), dtype=np.int64)
+    src_f = np.empty(k_rows * n_slots, dtype=np.int64)
+    src_k = np.empty(k_rows * n_slots, dtype=np.int64)
+    t_all = 0
+    for f in range(n_slots):
+        cols = _SLOT_COLS[kind, f]
+        first = t_all
+        for k in range(k_rows):
+            match = -1
+            for t in range(first, t_all):
+                same = True
+                for c in cols:
+                    if c >= 0 and params[src_k[t], c] != params[k, c]:
+                        same = False
+                        break
+                if same:
+                    match = t
+                    break
+            if match < 0:
+                src_f[t_all] = f
+                src_k[t_all] = k
+                match = t_all
+                t_all += 1
+            rows[k, f] = match
+    return src_f[:t_all], src_k[:t_all], rows
+
+
+@njit(cache=True)
+def _grid_row(kind, closes, ts_ns, tables, rows, p, dd_cap, out):
+    ind = np.empty((rows.shape[0], closes.shape[0]))
+    for f in range(rows.shape[0]):
+        ind[f] = tables[rows[f]]
+    _metrics_kernel(ts_ns, closes, _simulate(kind, closes, ind, p, dd_cap), out)
+
+
+# Like the batch kernels, each grid kernel carries its own ``prange`` loops
+# (first over the distinct slots, then over the grid rows) around serial
+# helpers: the AOT build compiles the exported functions without
+# ``parallel=True`` and cannot link a call into a parallel JIT kernel.
+
+
+@njit(cache=True, parallel=True)
+def _run_macdrsi_grid(highs, lows, closes, ts_ns, params, max_dd_cap):
+    src_f, src_k, rows = _grid_slots(KIND_MACDRSI, params)
+    tables = np.empty((src_f.shape[0], closes.shape[0]))
+    for t in prange(src_f.shape[0]):
+        tables[t] = _slot(KIND_MACDRSI, src_f[t], highs, lows, closes, params[src_k[t]])
+    out = np.empty((params.shape[0], len(GRID_METRICS)))
+    for k in prange(params.shape[0]):
+        _grid_row(KIND_MACDRSI, closes, ts_ns, tables, rows[k], params[k], max_dd_cap, out[k])
+    return out
+
+
+@njit(cache=True, parallel=True)
+def _run_smacross_grid(highs, lows, closes, ts_ns, params, max_dd_cap):
+    src_f, src_k, rows = _grid_slots(KIND_SMACROSS, params)
+    tables = np.empty((src_f.shape[0], closes.shape[0]))
+    for t in prange(src_f.shape[0]):
+        tables[t] = _slot(KIND_SMACROSS, src_f[t], highs, lows, closes, params[src_k[t]])
+    out = np.empty((params.shape[0], len(GRID_METRICS)))
+    for k in prange(params.shape[0]):
+        _grid_row(KIND_SMACROSS, closes, ts_ns, tables, rows[k], params[k], max_dd_cap, out[k])
+    return out
+
+
+@njit(cache=True, parallel=True)
+def _run_donchian_grid(highs, lows, closes, ts_ns, params, max_dd_cap):
+    src_f, src_k, rows = _grid_slots(KIND_DONCHIAN, params)
+    tables = np.empty((src_f.shape[0], closes.shape[0]))
+    for t in prange(src_f.shape[0]):
+        tables[t] = _slot(KIND_DONCHIAN, src_f[t], highs, lows, closes, params[src_k[t]])
+    out = np.empty((params.shape[0], len(GRID_METRICS)))
+    for k in prange(params.shape[0]):
+        _grid_row(KIND_DONCHIAN, closes, ts_ns, tables, rows[k], params[k], max_dd_cap, out[k])
+    return out
+
+
+@njit(cache=True, parallel=True)
+def _run_bollinger_grid(highs, lows, closes, ts_ns, params, max_dd_cap):
+    src_f, src_k, rows = _grid_slots(KIND_BOLLINGER, params)
+    tables = np.empty((src_f.shape[0], closes.shape[0]))
+    for t in prange(src_f.shape[0]):
+        tables[t] = _slot(KIND_BOLLINGER, src_f[t], highs, lows, closes, params[src_k[t]])
+    out = np.empty((params.shape[0], len(GRID_METRICS)))
+    for k in prange(params.shape[0]):
+        _grid_row(KIND_BOLLINGER, closes, ts_ns, tables, rows[k], params[k], max_dd_cap, out[k])
+    return out
+
+
+KERNEL_NAMES = ("macdrsi", "smacross", "donchian", "bollinger")
+
+try:
+    if os.environ.get("TRADING_BOT_NO_AOT"):
+        raise ImportError("AOT kernels disabled")
+    from . import _trading_kernels as _aot  # type: ignore[attr-defined]
+
+    HAVE_AOT = True
+except ImportError:
+    _aot = None
+    HAVE_AOT = False
+
+HAVE_KERNELS = HAVE_NUMBA or HAVE_AOT
+
+# Public entry points: the AOT build when present, else the JIT versions.
+# The JIT kernels above always call each other through the private names,
+# so rebinding these never affects what Numba compiles.
+for _name in KERNEL_NAMES:
+    for _suffix in ("", "_batch", "_grid"):
+        _key = f"run_{_name}{_suffix}"
+        globals()[_key] = getattr(_aot, _key) if HAVE_AOT else globals()[f"_{_key}"]
+del _name, _suffix, _key
+
+
+def _as_f8(*arrays: np.ndarray) -> tuple:
+    return tuple(np.ascontiguousarray(a, dtype=np.float64) for a in arrays)
+
+
+def run_batch(name: str, highs: np.ndarray, lows: np.ndarray, closes: np.ndarray, params: np.ndarray) -> tuple:
+    """Dispatch to ``run_<name>_batch`` for a ``params[K, P]`` block."""
+    if HAVE_AOT:
+        highs, lows, closes = _as_f8(highs, lows, closes)
+    return globals()[f"run_{name}_batch"](highs, lows, closes, params)
+
+
+def run_grid(
+    name: str,
+    highs: np.ndarray,
+    lows: np.ndarray,
+    closes: np.ndarray,
+    ts_ns: np.ndarray,
+    params: np.ndarray,
+    max_dd_cap: float = np.inf,
+) -> np.ndarray:
+    """Dispatch to ``run_<name>_grid``; returns ``metrics[K, len(GRID_METRICS)]``.
+
+    A row whose drawdown exceeds ``max_dd_cap`` stops at that bar, and its
+    metrics cover the bars up to there: ``max_dd`` is then above the cap,
+    the other entries are only partial.
+    """
+    if HAVE_AOT:
+        highs, lows, closes = _as_f8(highs, lows, closes)
+    return globals()[f"run_{name}_grid"](highs, lows, closes, ts_ns, params, float(max_dd_cap))
+
+
+_WARM_UP_PARAMS = {
+    "macdrsi": (2, 3, 2, 2, 50.0, 70.0, 0.02, 0.001, 100.0),
+    "smacross": (2, 3, 2, 50.0, 0.02, 0.001, 100.0),
+    "donchian": (2, 2, 2, 2.0, 0.001, 100.0),
+    "bollinger": (2, 2.0, 2, 35.0, 50.0, 2, 2.0, 0.001, 100.0),
+}
+
+
+def warm_up() -> None:
+    """Compile (or load from the on-disk cache) every kernel once.
+
+    Kernels are otherwise compiled lazily, by the first backtest that needs
+    them. Calling each one with a tiny float64 and float32 array up front
+    (``--warm_up`` on the CLI) moves that one-off cost before the first
+    backtest instead. Nothing to do when the AOT extension is in use.
+    """
+    if HAVE_AOT or not HAVE_NUMBA:
+        return
+    ts_ns = np.arange(8, dtype=np.int64) * 60_000_000_000
+    for dtype in (np.float64, np.float32):
+        x = np.linspace(1.0, 2.0, 8, dtype=dtype)
+        for name, p in _WARM_UP_PARAMS.items():
+            params = np.array([p], dtype=np.float64)
+            run_batch(name, x, x, x, params)
+            run_grid(name, x, x, x, ts_ns, params)
+
+
+def start_threads() -> None:
+    """Start Numba's thread pool from the calling thread.
+
+    With the TBB threading layer the interpreter hangs at exit if the pool
+    was first started from a worker thread. Callers that run the parallel
+    kernels only on a worker thread (live re-optimisation) call this on the
+    main thread first; it compiles and runs just one small grid kernel.
+    """
+    if HAVE_AOT or not HAVE_NUMBA:
+        return
+    x = np.linspace(1.0, 2.0, 8)
+    ts_ns = np.arange(8, dtype=np.int64) * 60_000_000_000
+    run_grid("donchian", x, x, x, ts_ns, np.array([_WARM_UP_PARAMS["donchian"]], dtype=np.float64))
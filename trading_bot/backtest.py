@@ -5,18 +5,133 @@ This module implements functions to run multiple strategies over a
 historical dataset and return the resulting strategy objects with their
 trade logs and equity curves. Backtesting is used both for manual
 evaluation and as part of the optimisation and interactive viewer tools.
+Independent symbols can be downloaded and backtested in parallel worker
+processes with :func:`run_backtest_symbols`.
 """
 
 from __future__ import annotations
 
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from typing import List, Tuple, Dict, Any
 
 import numpy as np
 import pandas as pd
 
+from . import _kernels
+from .data import fetch_klines
+from .indicators import IndicatorBus
 from .strategies import StrategyBase
 
-__all__ = ["run_backtest_multi"]
+__all__ = ["run_backtest_multi", "run_backtest_symbols"]
+
+
+class _CloseView:
+    """Close prices up to (and including) the current bar.
+
+    Handed to :meth:`StrategyBase.step` as ``df_close`` in place of a fresh
+    ``Series`` prefix per bar. ``len`` and ``to_numpy``/``values`` are served
+    straight from the shared array; any other attribute builds the pandas
+    Series once, on first use, so strategies that do call pandas methods
+    still see a regular Series.
+    """
+
+    __slots__ = ("_values", "_index", "_n", "_series")
+
+    def __init__(self, values: np.ndarray, index: pd.Index, n: int) -> None:
+        self._values = values
+        self._index = index
+        self._n = n
+        self._series: pd.Series | None = None
+
+    def __len__(self) -> int:
+        return self._n
+
+    @property
+    def values(self) -> np.ndarray:
+        return self._values[: self._n]
+
+    def to_numpy(self, dtype: Any = None, copy: bool = False) -> np.ndarray:
+        out = self._values[: self._n]
+        if dtype is not None or copy:
+            out = np.array(out, dtype=dtype, copy=copy or None)
+        return out
+
+    def __array__(self, dtype: Any = None, copy: bool | None = None) -> np.ndarray:
+        return self.to_numpy(dtype=dtype, copy=bool(copy))
+
+    def _as_series(self) -> pd.Series:
+        if self._series is None:
+            self._series = pd.Series(self._values[: self._n], index=self._index[: self._n])
+        return self._series
+
+    def __getitem__(self, key: Any) -> Any:
+        return self._as_series()[key]
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._as_series(), name)
+
+
+class _FrameView:
+    """The bars up to (and including) the current one.
+
+    Handed to :meth:`StrategyBase.step` as ``df_full`` in place of a fresh
+    ``df.iloc[: i + 1]`` per bar. The driver passes the bar's high/low to
+    ``step`` from its own arrays, so the built-in strategies only ever test
+    ``df_full`` for ``None``; ``len`` and column membership are answered
+    directly, and any other use builds the DataFrame prefix once, on first
+    access, so custom strategies still see a regular frame.
+    """
+
+    __slots__ = ("_df", "_n", "_frame")
+
+    def __init__(self, df: pd.DataFrame, n: int) -> None:
+        self._df = df
+        self._n = n
+        self._frame: pd.DataFrame | None = None
+
+    def __len__(self) -> int:
+        return self._n
+
+    def __contains__(self, key: Any) -> bool:
+        return key in self._df.columns
+
+    def _as_frame(self) -> pd.DataFrame:
+        if self._frame is None:
+            self._frame = self._df.iloc[: self._n]
+        return self._frame
+
+    def __getitem__(self, key: Any) -> Any:
+        return self._as_frame()[key]
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._as_frame(), name)
+
+
+def _price_arrays(df: pd.DataFrame) -> Tuple[pd.DataFrame, np.ndarray, np.ndarray, np.ndarray]:
+    """Return ``(df, highs, lows, closes)`` with rows lacking a close dropped.
+
+    Bars without a close are skipped entirely, so they are dropped once up
+    front rather than tested inside every bar loop. The arrays are fresh
+    writable copies: pandas' copy-on-write hands out read-only views, which
+    numba would compile as a separate signature. They are float32 when every
+    price column of ``df`` is (see ``fetch_klines(dtype=...)``), halving the
+    memory the kernels stream through, and float64 otherwise. Without
+    high/low columns the closes stand in for both.
+    """
+    valid = df["close"].notna().to_numpy()
+    if not valid.all():
+        df = df.loc[valid]
+    cols = ["close", "high", "low"] if "high" in df and "low" in df else ["close"]
+    dtype = np.float32 if all(df[c].dtype == np.float32 for c in cols) else np.float64
+    closes = np.array(df["close"], dtype=dtype)
+    if len(cols) == 3:
+        highs = np.array(df["high"], dtype=dtype)
+        lows = np.array(df["low"], dtype=dtype)
+    else:
+        highs = lows = closes
+    return df, highs, lows, closes
 
 
 def run_backtest_multi(
@@ -25,8 +140,9 @@ def run_backtest_multi(
     """Run multiple strategies over the same dataset.
 
     For each tuple in ``strategy_specs``, instantiate the strategy class with
-    a unique ``sid`` (starting at 1) and the provided parameter dict. Then
-    iterate over the historical data and call ``step`` on each strategy.
+    a unique ``sid`` (starting at 1) and the provided parameter dict. Strategies
+    with a compiled kernel (see :mod:`trading_bot._kernels`) run their whole
+    bar loop in one call; all others are driven bar by bar through ``step``.
 
     Parameters
     ----------
@@ -44,13 +160,111 @@ def run_backtest_multi(
     for idx, (Cls, params) in enumerate(strategy_specs, start=1):
         s = Cls(sid=idx, **params)
         strats.append(s)
-    closes: List[float] = []
-    for ts, row in df.iterrows():
-        px = row["close"]
-        if np.isnan(px):
-            continue
-        closes.append(px)
-        cs = pd.Series(closes, index=df.index[: len(closes)])
-        for s in strats:
-            s.step(ts, px, cs, df_full=df.iloc[: len(closes)])
-    return strats
\ No newline at end of file
+    # Build the price arrays and the timestamp index once. Each bar then only
+    # takes a _CloseView and a _FrameView instead of allocating a fresh
+    # Series and DataFrame prefix.
+    df, highs_arr, lows_arr, closes_arr = _price_arrays(df)
+    ts_index = df.index
+    # Group kernel-backed strategies by kernel so that several parameter sets
+    # of the same strategy run in one parallel batch call. The kernel is only
+    # trusted for the class that declares it: a subclass may override _decide.
+    stepped: List[StrategyBase] = []
+    batches: Dict[str, List[StrategyBase]] = {}
+    for s in strats:
+        has_kernel = type(s).__dict__.get("_kernel_name") is not None
+        if has_kernel and _kernels.HAVE_KERNELS and len(closes_arr):
+            batches.setdefault(s._kernel_name, []).append(s)
+        else:
+            stepped.append(s)
+    for name, members in batches.items():
+        params = np.array([m._kernel_params() for m in members], dtype=np.float64)
+        t_idx, t_side, t_qty, counts, equity, cash, position = _kernels.run_batch(
+            name, highs_arr, lows_arr, closes_arr, params
+        )
+        for k, m in enumerate(members):
+            nt = counts[k]
+            m._load_kernel_result(
+                ts_index,
+                closes_arr,
+                (t_idx[k, :nt], t_side[k, :nt], t_qty[k, :nt], equity[k], cash[k], position[k]),
+            )
+    if not stepped:
+        return strats
+    # The Python path always works in float64, like the kernels' arithmetic
+    highs_arr, lows_arr, closes_arr = (
+        x.astype(np.float64, copy=False) for x in (highs_arr, lows_arr, closes_arr)
+    )
+    # Stepped strategies share one indicator bus, so an indicator several of
+    # them need (e.g. rsi(14)) is updated once per bar instead of per strategy.
+    bus = IndicatorBus()
+    for s in stepped:
+        s.preallocate(len(closes_arr))
+        s.use_bus(bus)
+    for i in range(len(closes_arr)):
+        ts = ts_index[i]
+        px = closes_arr[i]
+        cs = _CloseView(closes_arr, ts_index, i + 1)
+        df_full = _FrameView(df, i + 1)
+        hi, lo = highs_arr[i], lows_arr[i]
+        bus.advance(hi, lo, px)
+        for s in stepped:
+            s.step(ts, px, cs, df_full=df_full, high=hi, low=lo)
+    return strats
+
+
+def _backtest_symbol(
+    symbol: str, interval: str, limit: int, strategy_specs: List[Tuple[type[StrategyBase], Dict[str, Any]]]
+) -> Tuple[pd.DataFrame, List[StrategyBase]]:
+    """Fetch one symbol and backtest it. Module-level so it can be pickled."""
+    df = fetch_klines(symbol, interval=interval, limit=limit)
+    return df, run_backtest_multi(df, strategy_specs)
+
+
+def run_backtest_symbols(
+    symbols: List[str],
+    interval: str,
+    limit: int,
+    strategy_specs: List[Tuple[type[StrategyBase], Dict[str, Any]]],
+    max_workers: int | None = None,
+) -> Dict[str, Tuple[pd.DataFrame, List[StrategyBase]]]:
+    """Download and backtest several symbols, one worker process per symbol.
+
+    Parameters
+    ----------
+    symbols : list of str
+        Trading pair symbols to backtest.
+    interval : str
+        Candle interval such as '1m', '5m', etc.
+    limit : int
+        Number of candles to fetch per symbol.
+    strategy_specs : list of tuples
+        A list where each element is (StrategyClass, params_dict).
+    max_workers : int, optional
+        Upper bound on worker processes. Defaults to the CPU count; with a
+        single worker everything runs in the current process.
+
+    Returns
+    -------
+    dict
+        Mapping of symbol to ``(df, strategies)`` in the order of ``symbols``.
+        Symbols whose download fails are reported and left out.
+    """
+    workers = min(len(symbols), max_workers or os.cpu_count() or 1)
+    out: Dict[str, Tuple[pd.DataFrame, List[StrategyBase]]] = {}
+    if workers <= 1:
+        for sym in symbols:
+            try:
+                out[sym] = _backtest_symbol(sym, interval, limit, strategy_specs)
+            except RuntimeError as e:
+                print(f"[BACKTEST] {sym}: {e}")
+        return out
+    # Spawn rather than fork: numba's threading layer is not fork-safe
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as ex:
+        futures = {ex.submit(_backtest_symbol, sym, interval, limit, strategy_specs): sym for sym in symbols}
+        for fut in as_completed(futures):
+            sym = futures[fut]
+            try:
+                out[sym] = fut.result()
+            except RuntimeError as e:
+                print(f"[BACKTEST] {sym}: {e}")
+    return {sym: out[sym] for sym in symbols if sym in out}
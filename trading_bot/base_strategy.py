@@ -5,16 +5,43 @@ This module defines :class:`StrategyBase`, an abstract class that provides
 common state management for trading strategies including position tracking,
 cash accounting, trade logging, and performance statistics. Concrete
 strategies should inherit from this class and implement the ``_decide``
-method to return trading signals.
+method to return trading signals. Strategies that keep incremental
+indicator state additionally override ``_update_indicators``, which is fed
+exactly one bar per :meth:`StrategyBase.step` call. Standard indicators are
+registered on the strategy's :class:`~trading_bot.indicators.IndicatorBus`
+(``self._bus``), which several strategies can share via
+:meth:`StrategyBase.use_bus`.
+
+The trade log and equity curve are stored column-wise in NumPy arrays
+(``trade_ts``/``trade_side``/``trade_price``/``trade_qty`` and
+``equity_ts``/``equity_vals``, timestamps as int64 nanoseconds since the
+epoch). The familiar list-of-tuples views are still available through the
+:attr:`StrategyBase.trades` and :attr:`StrategyBase.equity_series`
+properties.
 """
 
 from __future__ import annotations
 
+import inspect
+from functools import lru_cache
+
 import numpy as np
 import pandas as pd
 
+from .indicators import IndicatorBus
+
 __all__ = ["StrategyBase"]
 
+_INITIAL_CAPACITY = 64
+_SIDE_NAMES = {1: "BUY", -1: "SELL"}
+
+
+@lru_cache(maxsize=None)
+def _init_params(cls: type) -> frozenset[str]:
+    """Names of the constructor parameters :meth:`StrategyBase.reset` may replace."""
+    names = inspect.signature(cls.__init__).parameters
+    return frozenset(names) - {"self", "sid"}
+
 
 class StrategyBase:
     """Abstract base class for trading strategies.
@@ -24,8 +51,24 @@ class StrategyBase:
     performance metrics. Subclasses must implement the
     :meth:`_decide` method, which returns ``"BUY"``, ``"SELL"``, or
     ``None`` based on the current market data.
+
+    Strategies that also have a compiled bar loop in
+    :mod:`trading_bot._kernels` set :attr:`_kernel_name` and implement
+    :meth:`_kernel_params`; the backtest driver then runs them in one
+    kernel call instead of stepping bar by bar.
     """
 
+    #: Name of the kernel in :mod:`trading_bot._kernels` implementing this
+    #: strategy's bar loop, or ``None`` to always use :meth:`step`. Only
+    #: honoured on the class that sets it, not on its subclasses.
+    _kernel_name: str | None = None
+
+    #: Whether :meth:`reset` accepts new constructor parameters, i.e. the
+    #: constructor only stores them as same-named attributes and everything
+    #: derived from them is built in :meth:`_after_reset`. Only honoured on
+    #: the class that sets it, like :attr:`_kernel_name`.
+    _supports_reset: bool = False
+
     def __init__(self, sid: int, name: str, fee: float = 0.001, start_cash: float = 5000.0) -> None:
         self.sid = sid
         self.name = name
@@ -33,19 +76,178 @@ class StrategyBase:
         self.start_cash = start_cash
         self.reset()
 
-    def reset(self) -> None:
-        """Reset internal state before a backtest or live trading session."""
+    def reset(self, **params) -> None:
+        """Reset internal state before a backtest or live trading session.
+
+        Keyword arguments replace the constructor parameters of the same
+        name first, so one instance can be reused across a parameter grid
+        instead of constructing a new one per combination. That requires
+        :attr:`_supports_reset` on the strategy's class. The trade and
+        equity buffers of an instance are kept and overwritten, not
+        reallocated.
+        """
+        if params:
+            cls = type(self)
+            if not cls.__dict__.get("_supports_reset", False):
+                raise TypeError(f"{cls.__name__}.reset() does not accept parameters")
+            accepted = _init_params(cls)
+            # Validate every name before applying any, so a bad one leaves
+            # the instance untouched
+            for name in params:
+                if name not in accepted:
+                    raise TypeError(f"{cls.__name__}.reset() got an unexpected keyword argument {name!r}")
+            for name, value in params.items():
+                setattr(self, name, value)
         self.position = 0.0
         self.cash = float(self.start_cash)
-        self.trades: list[tuple[pd.Timestamp, str, float, float, int]] = []
-        self.equity_series: list[tuple[pd.Timestamp, float]] = []
+        if not hasattr(self, "trade_ts"):
+            # Trade log as parallel arrays; valid up to ``self._ntrades``
+            self.trade_ts = np.empty(_INITIAL_CAPACITY, dtype=np.int64)
+            self.trade_side = np.empty(_INITIAL_CAPACITY, dtype=np.int8)
+            self.trade_price = np.empty(_INITIAL_CAPACITY, dtype=np.float64)
+            self.trade_qty = np.empty(_INITIAL_CAPACITY, dtype=np.float64)
+            # Equity curve; valid up to ``self._nequity``
+            self.equity_ts = np.empty(_INITIAL_CAPACITY, dtype=np.int64)
+            self.equity_vals = np.empty(_INITIAL_CAPACITY, dtype=np.float64)
+        self._ntrades = 0
+        self._nequity = 0
+        self._tz = None
+        self._bars_seen = 0
+        # Private indicator bus, advanced by step(); see use_bus()
+        self._bus = IndicatorBus()
+        self._own_bus = True
         self._after_reset()
 
+    def use_bus(self, bus: IndicatorBus) -> None:
+        """Register this strategy's indicators on a shared ``bus``.
+
+        The caller then owns the bus and must :meth:`~IndicatorBus.advance`
+        it once per bar before calling :meth:`step`, starting from the first
+        bar. Indicator state is re-created, so call this before stepping.
+        """
+        self._bus = bus
+        self._own_bus = False
+        self._after_reset()
+
+    # ------------------------------------------------------------------
+    # Trade log / equity storage
+    # ------------------------------------------------------------------
+
+    def preallocate(self, n_bars: int) -> None:
+        """Size the trade and equity buffers for ``n_bars`` bars up front.
+
+        A backtest knows its length in advance; reserving the capacity once
+        avoids the geometric regrowth :meth:`step` otherwise falls back to.
+        At most one trade happens per bar, so ``n_bars`` also bounds the trade
+        log. Already recorded entries are kept; buffers never shrink.
+        """
+        if n_bars > len(self.trade_ts):
+            self.trade_ts = np.resize(self.trade_ts, n_bars)
+            self.trade_side = np.resize(self.trade_side, n_bars)
+            self.trade_price = np.resize(self.trade_price, n_bars)
+            self.trade_qty = np.resize(self.trade_qty, n_bars)
+        if n_bars > len(self.equity_ts):
+            self.equity_ts = np.resize(self.equity_ts, n_bars)
+            self.equity_vals = np.resize(self.equity_vals, n_bars)
+
+    def _ts_value(self, ts: pd.Timestamp) -> int:
+        """Return ``ts`` as int64 ns since the epoch, remembering its timezone."""
+        if not isinstance(ts, pd.Timestamp):
+            ts = pd.Timestamp(ts)
+        self._tz = ts.tz
+        return ts.value
+
+    def _to_timestamps(self, values: np.ndarray) -> pd.DatetimeIndex:
+        if self._tz is None:
+            return pd.to_datetime(values, unit="ns")
+        return pd.to_datetime(values, unit="ns", utc=True).tz_convert(self._tz)
+
+    def _record_trade(self, ts: pd.Timestamp, side: int, price: float, qty: float) -> None:
+        n = self._ntrades
+        if n == len(self.trade_ts):
+            cap = max(2 * n, _INITIAL_CAPACITY)
+            self.trade_ts = np.resize(self.trade_ts, cap)
+            self.trade_side = np.resize(self.trade_side, cap)
+            self.trade_price = np.resize(self.trade_price, cap)
+            self.trade_qty = np.resize(self.trade_qty, cap)
+        self.trade_ts[n] = self._ts_value(ts)
+        self.trade_side[n] = side
+        self.trade_price[n] = price
+        self.trade_qty[n] = qty
+        self._ntrades = n + 1
+
+    def _record_equity(self, ts: pd.Timestamp, value: float) -> None:
+        n = self._nequity
+        if n == len(self.equity_ts):
+            cap = max(2 * n, _INITIAL_CAPACITY)
+            self.equity_ts = np.resize(self.equity_ts, cap)
+            self.equity_vals = np.resize(self.equity_vals, cap)
+        self.equity_ts[n] = self._ts_value(ts)
+        self.equity_vals[n] = value
+        self._nequity = n + 1
+
+    @property
+    def trades(self) -> list[tuple[pd.Timestamp, str, float, float, int]]:
+        """Trade log as ``(ts, side, price, qty, sid)`` tuples, built on demand."""
+        n = self._ntrades
+        return [
+            (t, _SIDE_NAMES[side], price, qty, self.sid)
+            for t, side, price, qty in zip(
+                self._to_timestamps(self.trade_ts[:n]),
+                self.trade_side[:n].tolist(),
+                self.trade_price[:n].tolist(),
+                self.trade_qty[:n].tolist(),
+            )
+        ]
+
+    @property
+    def equity_series(self) -> list[tuple[pd.Timestamp, float]]:
+        """Equity curve as ``(ts, equity)`` tuples, built on demand."""
+        n = self._nequity
+        return list(zip(self._to_timestamps(self.equity_ts[:n]), self.equity_vals[:n].tolist()))
+
     def _after_reset(self) -> None:
         """Hook for subclasses to override. Called after :meth:`reset`."""
         pass
 
-    def step(self, ts: pd.Timestamp, price: float, df_close: pd.Series, df_full: pd.DataFrame | None = None) -> str | None:
+    def _update_indicators(self, price: float, high: float, low: float) -> None:
+        """Feed one bar into the strategy's incremental indicator state.
+
+        Called by :meth:`step` exactly once per bar, before :meth:`_decide`
+        and after ``self._bus`` has seen the same bar. The default
+        implementation keeps no state.
+        """
+        pass
+
+    def _warm_up(self, df_close: pd.Series, df_full: pd.DataFrame | None) -> None:
+        """Replay all but the last bar of the history into indicator state.
+
+        This lets a freshly created strategy (e.g. after a re-optimisation in
+        the live loop) start from the same indicator values a full-history
+        recomputation would give, without trading on the replayed bars.
+        """
+        closes = df_close.to_numpy(dtype=float)[:-1]
+        if df_full is not None and "high" in df_full and "low" in df_full:
+            highs = df_full["high"].to_numpy(dtype=float)[-len(df_close):-1]
+            lows = df_full["low"].to_numpy(dtype=float)[-len(df_close):-1]
+        else:
+            highs = lows = closes
+        for c, h, l in zip(closes, highs, lows):
+            if self._own_bus:
+                self._bus.advance(h, l, c)
+            self._update_indicators(c, h, l)
+            self._bars_seen += 1
+
+    def step(
+        self,
+        ts: pd.Timestamp,
+        price: float,
+        df_close: pd.Series,
+        df_full: pd.DataFrame | None = None,
+        *,
+        high: float | None = None,
+        low: float | None = None,
+    ) -> str | None:
         """Advance the strategy by one bar and act on signals.
 
         Subclasses should not override this method. They should instead
@@ -64,6 +266,11 @@ class StrategyBase:
         df_full : pandas.DataFrame, optional
             Full OHLC data up to the current bar. Some strategies may use
             additional columns like high/low for ATR.
+        high, low : float, optional
+            The current bar's high and low. Callers that hold the bars as
+            arrays pass them here, which saves two pandas column lookups
+            per strategy and bar; otherwise they are read from the last row
+            of ``df_full`` (or default to ``price``).
 
         Returns
         -------
@@ -71,6 +278,18 @@ class StrategyBase:
             The signal returned by the strategy: ``"BUY"``, ``"SELL"``, or
             ``None`` for no action.
         """
+        if self._bars_seen == 0 and len(df_close) > 1:
+            self._warm_up(df_close, df_full)
+        if high is None or low is None:
+            if df_full is not None and "high" in df_full and "low" in df_full:
+                high = df_full["high"].iat[-1]
+                low = df_full["low"].iat[-1]
+            else:
+                high = low = price
+        if self._own_bus:
+            self._bus.advance(high, low, price)
+        self._update_indicators(price, high, low)
+        self._bars_seen += 1
         sig = self._decide(ts, price, df_close, df_full)
         if sig == "BUY" and self.position == 0:
             qty = self.cash / (price * (1 + self.fee))
@@ -78,17 +297,47 @@ class StrategyBase:
                 # Deduct cost including fees
                 self.cash -= qty * price * (1 + self.fee)
                 self.position = qty
-                self.trades.append((ts, "BUY", price, qty, self.sid))
+                self._record_trade(ts, 1, price, qty)
         elif sig == "SELL" and self.position > 0:
             qty = self.position
             # Add proceeds minus fees
             self.cash += qty * price * (1 - self.fee)
             self.position = 0.0
-            self.trades.append((ts, "SELL", price, qty, self.sid))
+            self._record_trade(ts, -1, price, qty)
         # Record equity regardless of action
-        self.equity_series.append((ts, self.cash + self.position * price))
+        self._record_equity(ts, self.cash + self.position * price)
         return sig
 
+    def _kernel_params(self) -> tuple[float, ...]:
+        """Return the numeric parameter vector for this strategy's kernel.
+
+        Only used when :attr:`_kernel_name` is set; the layout must match the
+        ``p`` vector documented on the kernel in :mod:`trading_bot._kernels`.
+        """
+        raise NotImplementedError
+
+    def _load_kernel_result(self, ts_index: pd.Index, closes: np.ndarray, result: tuple) -> None:
+        """Populate trades, equity and account state from a kernel result.
+
+        Only the trade log, equity curve, cash and position are restored;
+        incremental indicator state is not, so the strategy should not be
+        stepped further afterwards.
+        """
+        trade_idx, trade_side, trade_qty, equity, cash, position = result
+        ts_ns = pd.DatetimeIndex(ts_index).as_unit("ns").asi8
+        self._tz = ts_index.tz
+        self.trade_ts = ts_ns[trade_idx]
+        self.trade_side = np.ascontiguousarray(trade_side, dtype=np.int8)
+        self.trade_price = closes[trade_idx].astype(np.float64)
+        self.trade_qty = np.ascontiguousarray(trade_qty, dtype=np.float64)
+        self._ntrades = len(trade_idx)
+        self.equity_ts = ts_ns.copy()
+        self.equity_vals = np.ascontiguousarray(equity, dtype=np.float64)
+        self._nequity = len(equity)
+        self.cash = float(cash)
+        self.position = float(position)
+        self._bars_seen = len(closes)
+
     def _decide(self, ts: pd.Timestamp, price: float, df_close: pd.Series, df_full: pd.DataFrame | None = None) -> str | None:
         """Return the trading signal for the current bar.
 
@@ -105,10 +354,11 @@ class StrategyBase:
         ratio, maximum drawdown, trade count, win rate, compound annual
         growth rate (CAGR), and number of days tested.
         """
-        if not self.equity_series:
+        n = self._nequity
+        if n == 0:
             return {}
-        times = [t for t, _ in self.equity_series]
-        vals = np.array([v for _, v in self.equity_series], dtype=float)
+        times = self.equity_ts[:n]
+        vals = self.equity_vals[:n]
         mask = ~np.isnan(vals)
         vals = vals[mask]
         if len(vals) == 0:
@@ -116,35 +366,33 @@ class StrategyBase:
         # Use the first valid timestamp and the last timestamp to compute duration
         t0 = times[np.argmax(mask)]
         t1 = times[-1]
-        days = max((t1 - t0).total_seconds() / 86400.0, 1e-9)
+        days = max((t1 - t0) / 1e9 / 86400.0, 1e-9)
         # Calculate returns
-        ret = pd.Series(vals).pct_change(fill_method=None).fillna(0.0).to_numpy()
+        # (same ``x / prev - 1`` form as pandas' pct_change; undefined -> 0)
+        ret = np.zeros(len(vals))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ret[1:] = vals[1:] / vals[:-1] - 1.0
+        ret[np.isnan(ret)] = 0.0
         mu = ret.mean()
         sigma = ret.std(ddof=1) if len(ret) > 1 else 0.0
         sharpe = (mu / sigma) * np.sqrt(1440) if sigma > 0 else 0.0
-        # Maximum drawdown
-        peak = vals[0]
-        max_dd = 0.0
-        for v in vals:
-            peak = max(peak, v)
-            if peak > 0:
-                max_dd = max(max_dd, (peak - v) / peak)
+        # Maximum drawdown from the running peak (bars with a non-positive
+        # peak are ignored)
+        peaks = np.maximum.accumulate(vals)
+        pos = peaks > 0
+        max_dd = float(((peaks[pos] - vals[pos]) / peaks[pos]).max(initial=0.0))
         start_eq = float(vals[0])
         end_eq = float(vals[-1])
         pnl = end_eq - start_eq
         years = days / 365.0
         cagr = (end_eq / start_eq) ** (1.0 / max(years, 1e-9)) - 1.0 if start_eq > 0 else 0.0
-        # Win/loss statistics
-        wins = losses = 0
-        for i in range(0, len(self.trades), 2):
-            if i + 1 >= len(self.trades):
-                break
-            buy = self.trades[i]
-            sell = self.trades[i + 1]
-            if (sell[2] - buy[2]) * buy[3] > 0:
-                wins += 1
-            else:
-                losses += 1
+        # Win/loss statistics over consecutive (BUY, SELL) pairs
+        npairs = self._ntrades // 2
+        buy_px = self.trade_price[0 : 2 * npairs : 2]
+        sell_px = self.trade_price[1 : 2 * npairs : 2]
+        buy_qty = self.trade_qty[0 : 2 * npairs : 2]
+        wins = int(((sell_px - buy_px) * buy_qty > 0).sum())
+        losses = npairs - wins
         winrate = wins / max(1, wins + losses)
         return {
             "sid": self.sid,
@@ -153,7 +401,7 @@ class StrategyBase:
             "pnl": pnl,
             "sharpe": float(sharpe),
             "max_dd": float(max_dd),
-            "trades": len(self.trades),
+            "trades": self._ntrades,
             "winrate": float(winrate),
             "cagr": float(cagr),
             "days": float(days),
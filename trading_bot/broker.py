@@ -13,7 +13,6 @@ import os
 import time
 import hmac
 import hashlib
-import urllib.parse
 from typing import Tuple, Dict, Any
 
 import requests
@@ -48,16 +47,28 @@ class BinanceBroker:
         self.base_url = BINANCE_TESTNET if testnet else BINANCE_REST
         self.api_key = os.getenv("BINANCE_API_KEY", "")
         self.api_secret = os.getenv("BINANCE_API_SECRET", "")
+        # Keyed HMAC-SHA256 state, copied per request instead of re-keying.
+        # hashlib is backed by OpenSSL, which uses the CPU's SHA extensions
+        # (SHA-NI) where available.
+        self._hmac_template = hmac.new(self.api_secret.encode(), digestmod=hashlib.sha256)
         self.cash = float(start_cash)
         self.position = 0.0
         self.trades: list[Tuple[str, float, float, datetime]] = []
 
-    def _signed_request(self, method: str, path: str, params: Dict[str, Any]) -> Dict[str, Any]:
+    def _signed_order(self, side: str, qty: float) -> Dict[str, Any]:
+        """Place a market order. The payload always has the same few ASCII
+        fields, so the query string is formatted directly instead of going
+        through ``urlencode``."""
+        ts = int(time.time() * 1000)
+        qs = f"symbol={self.symbol}&side={side}&type=MARKET&quantity={qty}&timestamp={ts}"
+        return self._send_signed("POST", "/api/v3/order", qs)
+
+    def _send_signed(self, method: str, path: str, qs: str) -> Dict[str, Any]:
         if not self.api_key or not self.api_secret:
             raise RuntimeError("API keys missing")
-        params["timestamp"] = int(time.time() * 1000)
-        qs = urllib.parse.urlencode(params)
-        sig = hmac.new(self.api_secret.encode(), qs.encode(), hashlib.sha256).hexdigest()
+        h = self._hmac_template.copy()
+        h.update(qs.encode())
+        sig = h.hexdigest()
         headers = {"X‑MBX‑APIKEY": self.api_key}
         url = f"{self.base_url}{path}?{qs}&signature={sig}"
         resp = requests.request(method, url, headers=headers, timeout=10)
@@ -80,11 +91,7 @@ class BinanceBroker:
             self.trades.append(("BUY", price, qty, datetime.now(timezone.utc)))
             return {"paper": True, "price": price, "qty": qty}
         else:
-            return self._signed_request(
-                "POST",
-                "/api/v3/order",
-                {"symbol": self.symbol, "side": "BUY", "type": "MARKET", "quantity": qty},
-            )
+            return self._signed_order("BUY", qty)
 
     def market_sell(self, qty: float, price_hint: float | None = None) -> Dict[str, Any]:
         """Execute a market sell order."""
@@ -96,11 +103,7 @@ class BinanceBroker:
             self.trades.append(("SELL", price, qty, datetime.now(timezone.utc)))
             return {"paper": True, "price": price, "qty": qty}
         else:
-            return self._signed_request(
-                "POST",
-                "/api/v3/order",
-                {"symbol": self.symbol, "side": "SELL", "type": "MARKET", "quantity": qty},
-            )
+            return self._signed_order("SELL", qty)
 
     def equity(self, price: float) -> float:
         """Return the current total equity (cash + value of held position)."""
@@ -25,6 +25,7 @@ from .optimizer import grid_search_one
 from .plotting import plot_with_numbered_trades
 from .viewer import interactive_backtest_viewer
 from .live import run_live
+from . import _kernels
 import os
 import matplotlib.pyplot as plt
 
@@ -83,7 +84,7 @@ def default_choices() -> List[Tuple[type, Dict[str, Any]]]:
     ]
 
 
-def optimise_all(df: Any) -> List[Tuple[type, Dict[str, Any]]]:
+def optimise_all(df: Any, coarse_to_fine: bool = False) -> List[Tuple[type, Dict[str, Any]]]:
     """
     Run a grid search for all built‑in strategies on the provided data.
 
@@ -91,6 +92,8 @@ def optimise_all(df: Any) -> List[Tuple[type, Dict[str, Any]]]:
     ----------
     df : pandas.DataFrame
         Historical OHLC data to optimise on.
+    coarse_to_fine : bool, optional
+        Use the cheaper two-stage search of :func:`grid_search_one`.
 
     Returns
     -------
@@ -99,7 +102,7 @@ def optimise_all(df: Any) -> List[Tuple[type, Dict[str, Any]]]:
     """
     out: List[Tuple[type, Dict[str, Any]]] = []
     for Cls in [MACDRSI, SMACross, DonchianBreakout]:
-        best_p, best_m = grid_search_one(df, Cls, fee=0.001)
+        best_p, best_m = grid_search_one(df, Cls, fee=0.001, coarse_to_fine=coarse_to_fine)
         print(f"Best {Cls.__name__}:", json.dumps(best_m, indent=2))
         out.append((Cls, best_p))
     return out
@@ -155,8 +158,13 @@ def main(argv: List[str] = None) -> None:
     parser.add_argument("--reopt_every", type=int, default=120)
     parser.add_argument("--hist_bars", type=int, default=1000)
     parser.add_argument("--live_mode", choices=["best", "all"], default="best")
+    parser.add_argument("--coarse_to_fine", action="store_true", help="Two-stage grid search in optimize mode")
+    parser.add_argument("--warm_up", action="store_true", help="Compile the backtest kernels before starting")
     args = parser.parse_args(argv)
 
+    if args.warm_up:
+        _kernels.warm_up()
+
     paper = args.paper.lower() == "true"
     testnet = args.testnet.lower() == "true"
 
@@ -165,7 +173,7 @@ def main(argv: List[str] = None) -> None:
         interactive_backtest_viewer(syms, args.interval, args.limit, default_choices())
     elif args.mode == "optimize":
         df = fetch_klines(args.symbol, interval=args.interval, limit=args.limit)
-        choices = optimise_all(df)
+        choices = optimise_all(df, coarse_to_fine=args.coarse_to_fine)
         run_backtest_and_plot(args.symbol, args.interval, args.limit, choices)
     # --- LIVE mode (single entrypoint) ---
     # --- LIVE mode: open exactly ONE window ---
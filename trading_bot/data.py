@@ -6,17 +6,115 @@ This module provides helpers for fetching historical and real-time
 cryptocurrency price data from the Binance REST API. All exceptions are
 wrapped with ASCII-safe messages so Windows consoles that default to
 ASCII won't choke on Unicode when printing tracebacks.
+
+Requests go through a module-level ``requests.Session`` so repeated calls
+reuse pooled keep-alive connections instead of paying a new TCP/TLS
+handshake each time; transient failures are retried with backoff by the
+session's adapter. Kline payloads are decoded with ``orjson`` when it is
+installed and converted to typed NumPy columns in one pass.
+
+Closed candles never change, so they are kept in a local Parquet cache (one
+file per host, symbol, interval and UTC day, keyed by candle open time) when
+``pyarrow`` is available. Repeated fetches of the same window only download
+the candles that are not on disk yet, and saving new candles only rewrites
+the days they fall on. :func:`cache_stats` reports hits, misses and bytes.
+Set ``TRADING_BOT_CACHE_DIR`` to move the cache or ``TRADING_BOT_NO_CACHE``
+to disable it.
+
+:class:`KlineStream` receives closed candles as Binance pushes them over its
+websocket kline stream (requires the optional ``websockets`` package), so
+live trading does not have to poll the REST API on a timer.
 """
 
 from __future__ import annotations
 
+import asyncio
+import json
+import os
+import threading
 import time
 import urllib.parse
+from collections import deque
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
 import requests
 import pandas as pd
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 BINANCE_REST = "https://api.binance.com"
 BINANCE_TESTNET = "https://testnet.binance.vision"
+BINANCE_WS = "wss://stream.binance.com:9443"
+
+_HEADERS = {"User-Agent": "python-requests/klines", "Accept-Charset": "utf-8"}
+_RETRY_STATUS = (429, 500, 502, 503, 504)
+_DEFAULT_RETRIES = 3
+
+
+@lru_cache(maxsize=None)
+def _session_for(max_retries: int) -> requests.Session:
+    """The pooled session making up to ``max_retries`` attempts per request.
+
+    Transient errors are retried with backoff. One session is kept per
+    attempt count, so a non-default ``max_retries`` does not open a new
+    connection pool on every call.
+    """
+    session = requests.Session()
+    retry = Retry(total=max(max_retries - 1, 0), backoff_factor=0.5, status_forcelist=_RETRY_STATUS)
+    adapter = HTTPAdapter(pool_connections=8, pool_maxsize=16, max_retries=retry)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update(_HEADERS)
+    return session
+
+
+_SESSION = _session_for(_DEFAULT_RETRIES)
+
+try:
+    import orjson
+
+    _json_loads = orjson.loads
+except ImportError:  # pragma: no cover - optional speed-up
+    _json_loads = json.loads
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - cache is optional
+    pa = pq = None
+
+try:
+    import websockets
+except ImportError:  # pragma: no cover - streaming is optional
+    websockets = None
+
+_OHLCV = ["open", "high", "low", "close", "volume"]
+
+# Fixed-length intervals whose candles are aligned to the Unix epoch. Longer
+# intervals (3d, 1w, 1M) are simply not cached.
+_INTERVAL_MS = {
+    "1s": 1_000,
+    "1m": 60_000,
+    "3m": 180_000,
+    "5m": 300_000,
+    "15m": 900_000,
+    "30m": 1_800_000,
+    "1h": 3_600_000,
+    "2h": 7_200_000,
+    "4h": 14_400_000,
+    "6h": 21_600_000,
+    "8h": 28_800_000,
+    "12h": 43_200_000,
+    "1d": 86_400_000,
+}
+
+_CACHE_DIR = Path(os.environ.get("TRADING_BOT_CACHE_DIR") or Path.home() / ".cache" / "trading_bot")
+_DAY_MS = 86_400_000
+
+# Running totals for cache_stats()
+_CACHE_STATS = {"hits": 0, "misses": 0, "bytes_read": 0, "bytes_written": 0}
 
 
 def _ascii_safe(obj) -> str:
@@ -43,68 +141,235 @@ def fetch_klines(
     base_url: str = BINANCE_REST,
     timeout: float = 12,
     max_retries: int = 3,
+    use_cache: bool = True,
+    dtype: str | np.dtype = "float64",
 ) -> pd.DataFrame:
     """
     Fetch OHLCV klines from Binance and return a DataFrame indexed by tz-aware
     timestamps (Europe/Berlin). Any raised RuntimeError uses ASCII-safe text.
+    Each request is attempted up to ``max_retries`` times in total, with
+    exponential backoff, on connection errors, 429/5xx responses and
+    Binance error payloads. With ``use_cache``
+    closed candles are served from and saved to the local Parquet cache.
+    Pass ``dtype="float32"`` to halve the memory of the OHLCV columns; the
+    backtest kernels then read float32 but still accumulate in float64.
     """
     symbol = symbol.upper()
-    params = {"symbol": symbol, "interval": interval, "limit": int(limit)}
+    limit = int(limit)
+    session = _session_for(int(max_retries))
+    iv = _INTERVAL_MS.get(interval)
+    path = None
+    if use_cache and pq is not None and iv is not None and not os.environ.get("TRADING_BOT_NO_CACHE"):
+        path = _cache_path(base_url, symbol, interval)
+
+    params = {"symbol": symbol, "interval": interval, "limit": limit}
     if end_time is not None:
         params["endTime"] = int(end_time)
 
+    if path is None:
+        ot, ohlcv = _request_klines(session, base_url, params, timeout, max_retries)
+    else:
+        now_ms = int(time.time() * 1000)
+        last_open = (int(end_time) if end_time is not None else now_ms) // iv * iv
+        first_open = last_open - (limit - 1) * iv
+        c_ot, c_ohlcv = _cache_read(path, first_open, last_open)
+        # Only a gap-free run starting at the first wanted candle can be reused
+        if len(c_ot) and c_ot[0] == first_open and c_ot[-1] == first_open + (len(c_ot) - 1) * iv:
+            if len(c_ot) < limit:
+                params["startTime"] = int(c_ot[-1]) + iv
+                params["limit"] = limit - len(c_ot)
+                n_ot, n_ohlcv = _request_klines(session, base_url, params, timeout, max_retries)
+                ot = np.concatenate([c_ot, n_ot])
+                ohlcv = np.concatenate([c_ohlcv, n_ohlcv])
+            else:
+                ot, ohlcv, n_ot = c_ot, c_ohlcv, c_ot[:0]
+            _CACHE_STATS["hits"] += len(c_ot)
+        else:
+            ot, ohlcv = _request_klines(session, base_url, params, timeout, max_retries)
+            n_ot = ot
+        _CACHE_STATS["misses"] += len(n_ot)
+        if len(n_ot):
+            closed = ot + iv <= now_ms
+            _cache_write(path, ot[closed], ohlcv[closed])
+
+    if not len(ot):
+        raise RuntimeError(_ascii_safe("fetch_klines failed: No valid candles parsed"))
+    ts = pd.to_datetime(ot, unit="ms", utc=True).tz_convert("Europe/Berlin")
+    df = pd.DataFrame(ohlcv.astype(dtype, copy=False), columns=_OHLCV, index=ts).dropna(subset=["close"])
+
+    if df.empty:
+        raise RuntimeError(_ascii_safe("fetch_klines failed: No valid candles (all NaN) after parsing."))
+    return df
+
+
+def fetch_klines_since(
+    symbol: str,
+    interval: str,
+    start_ms: int,
+    end_ms: int | None = None,
+    base_url: str = BINANCE_REST,
+    timeout: float = 12,
+    dtype: str | np.dtype = "float64",
+) -> pd.DataFrame:
+    """
+    Fetch the closed klines opened at or after ``start_ms`` (and before
+    ``end_ms``, if given), formatted like :func:`fetch_klines`. Meant for
+    topping up history that is already in memory, so it downloads only the
+    missing candles, in pages of 1000, and returns an empty frame rather
+    than raising when there are none yet. The still-forming candle is left
+    out, as are all candles when ``interval`` is not a known Binance
+    interval.
+    """
+    symbol = symbol.upper()
+    iv = _INTERVAL_MS.get(interval)
+    now_ms = int(time.time() * 1000)
+    stop = now_ms if end_ms is None else min(int(end_ms), now_ms)
+    ots, rows = [], []
+    start = int(start_ms)
+    while iv is not None and start + iv <= stop:
+        params = {"symbol": symbol, "interval": interval, "startTime": start, "endTime": stop - iv, "limit": 1000}
+        ot, ohlcv = _request_klines(_SESSION, base_url, params, timeout)
+        ots.append(ot)
+        rows.append(ohlcv)
+        if len(ot) < 1000:
+            break
+        start = int(ot[-1]) + iv
+    ot = np.concatenate(ots) if ots else np.empty(0, dtype=np.int64)
+    ohlcv = np.concatenate(rows) if rows else np.empty((0, 5), dtype=np.float64)
+    keep = ot + (iv or 0) <= stop
+    ts = pd.to_datetime(ot[keep], unit="ms", utc=True).tz_convert("Europe/Berlin")
+    return pd.DataFrame(ohlcv[keep].astype(dtype, copy=False), columns=_OHLCV, index=ts).dropna(subset=["close"])
+
+
+def _request_klines(
+    session: requests.Session, base_url: str, params: dict, timeout: float, max_retries: int = _DEFAULT_RETRIES
+) -> tuple[np.ndarray, np.ndarray]:
+    """Download one klines page and return ``(open_ms, ohlcv)`` arrays.
+
+    The session's adapter retries connection errors and 429/5xx responses;
+    a Binance error payload (HTTP 200 with a ``code``) is retried here, up
+    to the same ``max_retries`` attempts.
+    """
     url = f"{base_url}/api/v3/klines?" + urllib.parse.urlencode(params)
-    headers = {"User-Agent": "python-requests/klines", "Accept-Charset": "utf-8"}
 
-    last_err = None
-    for _ in range(max_retries):
+    for attempt in range(max(int(max_retries), 1)):
+        if attempt:
+            time.sleep(0.5 * 2 ** (attempt - 1))
         try:
-            r = requests.get(url, headers=headers, timeout=timeout)
-            # make sure requests decodes body as UTF-8 if needed
-            r.encoding = r.encoding or "utf-8"
+            r = session.get(url, timeout=timeout)
             r.raise_for_status()
-            data = r.json()
-
-            # Binance error object
-            if isinstance(data, dict) and "code" in data:
-                raise RuntimeError(
-                    _ascii_safe(f"Binance error {data.get('code')}: {data.get('msg')}")
-                )
-            if not isinstance(data, list):
-                raise RuntimeError(_ascii_safe(f"Unexpected payload type: {type(data)}"))
-
-            rows = []
-            for k in data:
-                if not isinstance(k, list) or len(k) < 6:
-                    continue
-                try:
-                    rows.append(
-                        (int(k[0]), float(k[1]), float(k[2]), float(k[3]), float(k[4]), float(k[5]))
-                    )
-                except Exception as e:
-                    # Skip malformed row; keep going
-                    last_err = e
-                    continue
-
-            if not rows:
-                raise RuntimeError(_ascii_safe("No valid candles parsed"))
-
-            ot, o, h, l, c, v = map(list, zip(*rows))
-            ts = pd.to_datetime(ot, unit="ms", utc=True).tz_convert("Europe/Berlin")
-            df = pd.DataFrame(
-                {"open": o, "high": h, "low": l, "close": c, "volume": v},
-                index=ts,
-            ).dropna(subset=["close"])
-
-            if df.empty:
-                raise RuntimeError(_ascii_safe("No valid candles (all NaN) after parsing."))
-            return df
-
+            data = _json_loads(r.content)
         except Exception as e:
-            last_err = e
-            time.sleep(1.0)
+            raise RuntimeError(f"fetch_klines failed: {_ascii_safe(e)}")
+        # Binance error object
+        if not (isinstance(data, dict) and "code" in data):
+            break
+    else:
+        raise RuntimeError(
+            _ascii_safe(f"fetch_klines failed: Binance error {data.get('code')}: {data.get('msg')}")
+        )
+    if not isinstance(data, list):
+        raise RuntimeError(_ascii_safe(f"fetch_klines failed: Unexpected payload type: {type(data)}"))
 
-    raise RuntimeError(f"fetch_klines failed: {_ascii_safe(last_err)}")
+    return _parse_klines(data)
+
+
+def cache_stats() -> dict:
+    """
+    Kline cache counters since import: ``hits`` and ``misses`` count the
+    candles cached fetches served from disk and downloaded, ``bytes_read``
+    and ``bytes_written`` the sizes of the Parquet files read and written.
+    """
+    return dict(_CACHE_STATS)
+
+
+def _cache_path(base_url: str, symbol: str, interval: str) -> Path:
+    """Directory of the Parquet cache for one host/symbol/interval."""
+    host = urllib.parse.urlparse(base_url).netloc.replace(":", "_") or "default"
+    return _CACHE_DIR / host / f"{symbol}_{interval}"
+
+
+def _cache_day_file(path: Path, day: int) -> Path:
+    """File holding the candles opened on UTC day ``day`` (days since the epoch)."""
+    return path / (time.strftime("%Y%m%d", time.gmtime(int(day) * 86_400)) + ".parquet")
+
+
+def _cache_read(path: Path, first_ms: int, last_ms: int) -> tuple[np.ndarray, np.ndarray]:
+    """Read cached candles with ``first_ms <= open_ms <= last_ms``, sorted by time."""
+    ots, rows = [], []
+    for day in range(first_ms // _DAY_MS, last_ms // _DAY_MS + 1):
+        f = _cache_day_file(path, day)
+        try:
+            table = pq.read_table(f, filters=[("open_ms", ">=", first_ms), ("open_ms", "<=", last_ms)])
+            _CACHE_STATS["bytes_read"] += f.stat().st_size
+        except Exception:
+            # A missing or unreadable day is a miss, and ends the usable run
+            break
+        ots.append(table.column("open_ms").to_numpy())
+        rows.append(np.column_stack([table.column(c).to_numpy() for c in _OHLCV]))
+    if not ots:
+        return np.empty(0, dtype=np.int64), np.empty((0, 5), dtype=np.float64)
+    ot, ohlcv = np.concatenate(ots), np.concatenate(rows)
+    order = np.argsort(ot, kind="stable")
+    return ot[order], ohlcv[order]
+
+
+def _cache_write(path: Path, ot: np.ndarray, ohlcv: np.ndarray) -> None:
+    """Merge closed candles into the cache, rewriting only the days they fall on."""
+    days = ot // _DAY_MS
+    for day in np.unique(days):
+        sel = days == day
+        _cache_write_day(_cache_day_file(path, day), ot[sel], ohlcv[sel])
+
+
+def _cache_write_day(path: Path, ot: np.ndarray, ohlcv: np.ndarray) -> None:
+    """Merge candles into one day file. Failures are ignored."""
+    try:
+        if path.exists():
+            table = pq.read_table(path)
+            old_ot = table.column("open_ms").to_numpy()
+            keep = ~np.isin(old_ot, ot)
+            old = np.column_stack([table.column(c).to_numpy() for c in _OHLCV])
+            ot = np.concatenate([old_ot[keep], ot])
+            ohlcv = np.concatenate([old[keep], ohlcv])
+        order = np.argsort(ot, kind="stable")
+        ot, ohlcv = ot[order], ohlcv[order]
+        table = pa.table({"open_ms": ot, **{c: ohlcv[:, j] for j, c in enumerate(_OHLCV)}})
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write to a temporary file first so concurrent readers never see a partial file
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        pq.write_table(table, tmp, compression="zstd")
+        _CACHE_STATS["bytes_written"] += tmp.stat().st_size
+        os.replace(tmp, path)
+    except Exception as e:
+        print(f"[CACHE] could not update {path.parent.name}/{path.name}: {_ascii_safe(e)}")
+
+
+def _parse_klines(data: list) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Convert a Binance klines payload into open times (int64 ms) and an
+    ``(N, 5)`` float64 OHLCV array. Well-formed payloads are converted in one
+    NumPy pass; otherwise rows that are too short or malformed are skipped.
+    """
+    try:
+        arr = np.array(data, dtype=object)
+        if arr.ndim == 2 and arr.shape[1] >= 6:
+            return arr[:, 0].astype(np.int64), arr[:, 1:6].astype(np.float64)
+    except (TypeError, ValueError):
+        pass
+
+    ot, rows = [], []
+    for k in data:
+        if not isinstance(k, list) or len(k) < 6:
+            continue
+        try:
+            row = [float(x) for x in k[1:6]]
+            ot.append(int(k[0]))
+        except Exception:
+            # Skip malformed row; keep going
+            continue
+        rows.append(row)
+    return np.array(ot, dtype=np.int64), np.array(rows, dtype=np.float64).reshape(-1, 5)
 
 
 def stream_latest_close(symbol: str, base_url: str = BINANCE_REST):
@@ -114,13 +379,97 @@ def stream_latest_close(symbol: str, base_url: str = BINANCE_REST):
     """
     try:
         url = f"{base_url}/api/v3/klines?symbol={symbol}&interval=1m&limit=1"
-        headers = {"User-Agent": "python-requests/klines", "Accept-Charset": "utf-8"}
-        r = requests.get(url, headers=headers, timeout=5)
-        r.encoding = r.encoding or "utf-8"
+        r = _SESSION.get(url, timeout=5)
         r.raise_for_status()
-        k = r.json()[0]
+        k = _json_loads(r.content)[0]
         ts = pd.to_datetime(int(k[0]) // 1000, unit="s", utc=True).tz_convert("Europe/Berlin")
         px = float(k[4])
         return ts, px
     except Exception as e:
         raise RuntimeError(f"stream_latest_close failed: {_ascii_safe(e)}")
+
+
+class KlineStream:
+    """
+    Closed candles of one symbol pushed by Binance's websocket kline stream.
+
+    An asyncio consumer runs in a daemon thread and appends each candle whose
+    ``x`` (closed) flag is set to an internal queue; :meth:`pop` drains it
+    without any network I/O. Dropped connections are re-established with
+    backoff. Requires the optional ``websockets`` package.
+    """
+
+    def __init__(self, symbol: str, interval: str = "1m", base_url: str = BINANCE_WS) -> None:
+        if websockets is None:
+            raise RuntimeError("KlineStream needs the optional 'websockets' package")
+        self.symbol = symbol.upper()
+        self.url = f"{base_url}/ws/{symbol.lower()}@kline_{interval}"
+        self.bar_closed = threading.Event()
+        self._bars: deque = deque()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._task: asyncio.Task | None = None
+        self._thread: threading.Thread | None = None
+        self._stopped = False
+
+    def start(self) -> "KlineStream":
+        self._thread = threading.Thread(target=self._run, name=f"klines-{self.symbol}", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        # The flag covers a stream stopped before its loop is running: the
+        # consumer checks it once it starts and after every (re)connect
+        self._stopped = True
+        if self._loop is not None and self._task is not None:
+            try:
+                self._loop.call_soon_threadsafe(self._task.cancel)
+            except RuntimeError:  # loop already closed
+                pass
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+
+    def pop(self) -> list[tuple[pd.Timestamp, dict]]:
+        """Return the closed candles received since the last call, oldest first.
+
+        Each item is ``(open_time, {"open": ..., "high": ..., "low": ...,
+        "close": ..., "volume": ...})`` with the same timestamps as
+        :func:`fetch_klines`.
+        """
+        self.bar_closed.clear()
+        out = []
+        while self._bars:
+            out.append(self._bars.popleft())
+        return out
+
+    def _run(self) -> None:
+        try:
+            asyncio.run(self._consume())
+        except asyncio.CancelledError:
+            pass
+
+    async def _consume(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._task = asyncio.current_task()
+        delay = 1.0
+        while not self._stopped:
+            try:
+                async with websockets.connect(self.url, ping_interval=20) as ws:
+                    delay = 1.0
+                    if self._stopped:
+                        break
+                    async for msg in ws:
+                        if self._stopped:
+                            break
+                        k = _json_loads(msg)["k"]
+                        if not k["x"]:
+                            continue
+                        ts = pd.to_datetime(int(k["t"]), unit="ms", utc=True).tz_convert("Europe/Berlin")
+                        row = {c: float(k[f]) for c, f in zip(_OHLCV, "ohlcv")}
+                        self._bars.append((ts, row))
+                        self.bar_closed.set()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"[STREAM] {self.symbol}: {_ascii_safe(e)}; reconnecting in {delay:.0f}s")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 60.0)
@@ -5,13 +5,40 @@ This module implements common technical analysis indicators required by
 the built‑in strategies. The functions operate on pandas Series or
 DataFrames and return pandas objects of the same length where
 appropriate.
+
+For bar-by-bar consumers the module also provides small incremental state
+objects (:class:`SmaState`, :class:`EmaState`, :class:`RsiState`,
+:class:`AtrState`, ...). Each exposes an ``update`` method that consumes a
+single new observation in O(1) and returns the indicator value for that
+bar, matching the last element of the corresponding vectorised function.
+:class:`IndicatorBus` lets several strategies stepped over the same bars
+share one instance of each such state.
 """
 
 from __future__ import annotations
 
+import math
+from collections import deque
+from dataclasses import dataclass, field
+
+import numpy as np
 import pandas as pd
 
-__all__ = ["rsi", "macd", "sma", "atr"]
+__all__ = [
+    "rsi",
+    "macd",
+    "sma",
+    "atr",
+    "SmaState",
+    "EmaState",
+    "MacdHistState",
+    "RsiState",
+    "AtrState",
+    "StdState",
+    "RollingMaxState",
+    "RollingMinState",
+    "IndicatorBus",
+]
 
 
 def rsi(series: pd.Series, period: int = 14) -> pd.Series:
@@ -30,12 +57,31 @@ def rsi(series: pd.Series, period: int = 14) -> pd.Series:
         RSI values in the range 0–100. The returned series aligns with the
         input index and contains NaNs for the first ``period`` elements.
     """
-    delta = series.diff()
-    gain = delta.clip(lower=0).rolling(period).mean()
-    loss = (-delta.clip(upper=0)).rolling(period).mean()
-    rs = gain / loss
-    out = 100 - (100 / (1 + rs))
-    return out
+    x = series.to_numpy(dtype=float)
+    out = np.full(len(x), np.nan)
+    if len(x) > period:
+        delta = np.diff(x)
+        gain_sum = _window_sums(np.maximum(delta, 0.0), period)
+        loss_sum = _window_sums(np.maximum(-delta, 0.0), period)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            # x/0 -> inf -> RSI 100 and 0/0 -> NaN, as with pandas
+            out[period:] = 100 - 100 / (1 + (gain_sum / period) / (loss_sum / period))
+    return pd.Series(out, index=series.index, name=series.name)
+
+
+def _window_sums(x: np.ndarray, n: int) -> np.ndarray:
+    """Sums over every full length-``n`` window of ``x`` via prefix sums.
+
+    Returns ``len(x) - n + 1`` values; windows containing a NaN are NaN,
+    matching ``Series.rolling(n).sum()``.
+    """
+    nan = np.isnan(x)
+    cs = np.concatenate(([0.0], np.cumsum(np.where(nan, 0.0, x))))
+    sums = cs[n:] - cs[:-n]
+    if nan.any():
+        cn = np.concatenate(([0], np.cumsum(nan)))
+        sums[(cn[n:] - cn[:-n]) > 0] = np.nan
+    return sums
 
 
 def macd(
@@ -103,13 +149,299 @@ def atr(df: pd.DataFrame, n: int = 14) -> pd.Series:
     pandas.Series
         ATR values.
     """
-    h = df["high"]
-    l = df["low"]
-    c = df["close"]
-    prev_c = c.shift(1)
-    true_range = pd.concat([
-        (h - l),
-        (h - prev_c).abs(),
-        (l - prev_c).abs(),
-    ], axis=1).max(axis=1)
-    return true_range.rolling(n).mean()
\ No newline at end of file
+    h = df["high"].to_numpy(dtype=float)
+    l = df["low"].to_numpy(dtype=float)
+    c = df["close"].to_numpy(dtype=float)
+    prev_c = np.empty_like(c)
+    prev_c[:1] = np.nan
+    prev_c[1:] = c[:-1]
+    # fmax ignores NaN like the pandas row-wise max did, so the first bar's
+    # true range is simply high - low
+    true_range = np.fmax.reduce([h - l, np.abs(h - prev_c), np.abs(l - prev_c)])
+    out = np.full(len(c), np.nan)
+    if len(c) >= n:
+        out[n - 1:] = _window_sums(true_range, n) / n
+    return pd.Series(out, index=df.index)
+
+# ---------------------------------------------------------------------------
+# Incremental indicator state
+# ---------------------------------------------------------------------------
+
+
+@dataclass
+class SmaState:
+    """Sliding-window simple moving average.
+
+    Keeps the last ``window`` observations and their running sum so each
+    update is ``V[t] = V[t-1] + (x[t] - x[t-w]) / w``. Returns NaN until the
+    window is full, like ``Series.rolling(window).mean()``.
+    """
+
+    window: int
+    buf: deque = field(init=False)
+    total: float = 0.0
+
+    def __post_init__(self) -> None:
+        # Full buffers drop their oldest value on append
+        self.buf = deque(maxlen=self.window)
+
+    def update(self, x: float) -> float:
+        buf = self.buf
+        if len(buf) == self.window:
+            # Window full: the new value in, the oldest out
+            self.total += x
+            self.total -= buf[0]
+            buf.append(x)
+            return self.total / self.window
+        buf.append(x)
+        self.total += x
+        if len(buf) < self.window:
+            return math.nan
+        return self.total / self.window
+
+
+@dataclass
+class StdState:
+    """Sliding-window population standard deviation (``ddof=0``).
+
+    Sums are taken relative to the first observation seen (the shifted-data
+    algorithm) so the ``E[x²] - E[x]²`` form does not lose precision at
+    typical price levels.
+    """
+
+    window: int
+    buf: deque = field(init=False)
+    shift: float | None = None
+    total: float = 0.0
+    total_sq: float = 0.0
+
+    def __post_init__(self) -> None:
+        self.buf = deque(maxlen=self.window)
+
+    def update(self, x: float) -> float:
+        if self.shift is None:
+            self.shift = x
+        d = x - self.shift
+        buf = self.buf
+        if len(buf) == self.window:
+            old = buf[0]
+            buf.append(d)
+            self.total += d
+            self.total_sq += d * d
+            self.total -= old
+            self.total_sq -= old * old
+        else:
+            buf.append(d)
+            self.total += d
+            self.total_sq += d * d
+            if len(buf) < self.window:
+                return math.nan
+        mean = self.total / self.window
+        return math.sqrt(max(self.total_sq / self.window - mean * mean, 0.0))
+
+
+@dataclass
+class EmaState:
+    """Exponential moving average with ``adjust=False`` semantics.
+
+    ``e[t] = alpha * x[t] + (1 - alpha) * e[t-1]`` seeded with the first
+    observation, matching ``Series.ewm(span=span, adjust=False).mean()``.
+    """
+
+    span: int
+    value: float | None = None
+
+    @property
+    def alpha(self) -> float:
+        # Same derivation as pandas (span -> com -> alpha) to match bit-for-bit
+        return 1.0 / (1.0 + (self.span - 1) / 2.0)
+
+    def update(self, x: float) -> float:
+        if self.value is None:
+            self.value = x
+        else:
+            a = self.alpha
+            self.value = (1.0 - a) * self.value + a * x
+        return self.value
+
+
+@dataclass
+class MacdHistState:
+    """Incremental MACD histogram, the third output of :func:`macd`.
+
+    Owns its fast/slow/signal :class:`EmaState`, so on an
+    :class:`IndicatorBus` all strategies with the same three spans share
+    one signal line instead of smoothing their own.
+    """
+
+    fast: int
+    slow: int
+    signal: int
+    ema_fast: EmaState = field(init=False)
+    ema_slow: EmaState = field(init=False)
+    ema_signal: EmaState = field(init=False)
+
+    def __post_init__(self) -> None:
+        self.ema_fast = EmaState(self.fast)
+        self.ema_slow = EmaState(self.slow)
+        self.ema_signal = EmaState(self.signal)
+
+    def update(self, x: float) -> float:
+        m = self.ema_fast.update(x) - self.ema_slow.update(x)
+        return m - self.ema_signal.update(m)
+
+
+@dataclass
+class RsiState:
+    """Incremental RSI matching :func:`rsi`.
+
+    Average gain and loss are simple moving averages of the clipped price
+    deltas over ``period`` bars, exactly as in the vectorised version.
+    """
+
+    period: int
+    prev_close: float | None = None
+    gain: SmaState = field(init=False)
+    loss: SmaState = field(init=False)
+
+    def __post_init__(self) -> None:
+        self.gain = SmaState(self.period)
+        self.loss = SmaState(self.period)
+
+    def update(self, x: float) -> float:
+        if self.prev_close is None:
+            self.prev_close = x
+            return math.nan
+        delta = x - self.prev_close
+        self.prev_close = x
+        avg_gain = self.gain.update(max(delta, 0.0))
+        avg_loss = self.loss.update(max(-delta, 0.0))
+        if avg_loss == 0.0:
+            # pandas yields inf (RSI 100) for x/0 and NaN for 0/0
+            return 100.0 if avg_gain > 0.0 else math.nan
+        return 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+
+
+@dataclass
+class AtrState:
+    """Incremental ATR matching :func:`atr` (SMA of the true range)."""
+
+    period: int
+    prev_close: float | None = None
+    tr_mean: SmaState = field(init=False)
+
+    def __post_init__(self) -> None:
+        self.tr_mean = SmaState(self.period)
+
+    def update(self, high: float, low: float, close: float) -> float:
+        tr = high - low
+        if self.prev_close is not None:
+            tr = max(tr, abs(high - self.prev_close), abs(low - self.prev_close))
+        self.prev_close = close
+        return self.tr_mean.update(tr)
+
+
+@dataclass
+class RollingMaxState:
+    """Sliding-window maximum using a monotonic deque (amortised O(1))."""
+
+    window: int
+    count: int = 0
+    buf: deque = field(default_factory=deque)
+
+    def update(self, x: float) -> float:
+        i = self.count
+        self.count += 1
+        buf = self.buf
+        while buf and buf[-1][1] <= x:
+            buf.pop()
+        buf.append((i, x))
+        if buf[0][0] <= i - self.window:
+            buf.popleft()
+        if self.count < self.window:
+            return math.nan
+        return buf[0][1]
+
+
+@dataclass
+class RollingMinState(RollingMaxState):
+    """Sliding-window minimum; the mirror image of :class:`RollingMaxState`."""
+
+    def update(self, x: float) -> float:
+        # Spelled out rather than negating around RollingMaxState.update:
+        # the extra call and two negations nearly doubled the cost per bar
+        i = self.count
+        self.count += 1
+        buf = self.buf
+        while buf and buf[-1][1] >= x:
+            buf.pop()
+        buf.append((i, x))
+        if buf[0][0] <= i - self.window:
+            buf.popleft()
+        if self.count < self.window:
+            return math.nan
+        return buf[0][1]
+
+
+# ---------------------------------------------------------------------------
+# Shared indicator states
+# ---------------------------------------------------------------------------
+
+# Indicator name -> (state class, input). The input selects what ``update``
+# receives each bar: the close, the high, the low, or all three.
+_CLOSE, _HIGH, _LOW, _HLC = range(4)
+_BUS_KINDS = {
+    "sma": (SmaState, _CLOSE),
+    "ema": (EmaState, _CLOSE),
+    "macd_hist": (MacdHistState, _CLOSE),
+    "std": (StdState, _CLOSE),
+    "rsi": (RsiState, _CLOSE),
+    "atr": (AtrState, _HLC),
+    "high_max": (RollingMaxState, _HIGH),
+    "low_min": (RollingMinState, _LOW),
+}
+
+
+class IndicatorBus:
+    """A set of incremental indicator states advanced once per bar.
+
+    Strategies :meth:`register` the indicators they need and read the
+    current values by key after each :meth:`advance`. Identical requests
+    (same name and parameters) share one state, so e.g. two strategies that
+    both need ``rsi(14)`` cost a single update per bar. All indicators must
+    be registered before the first :meth:`advance`.
+    """
+
+    def __init__(self) -> None:
+        self._entries: list[tuple[tuple, object, int]] = []
+        self._values: dict[tuple, float] = {}
+        self.bars = 0
+
+    def register(self, name: str, *params: int | float) -> tuple:
+        """Add indicator ``name`` (see ``_BUS_KINDS``) and return its key."""
+        key = (name, *params)
+        if key not in self._values:
+            if self.bars:
+                raise RuntimeError(f"cannot register {key} after the first bar")
+            cls, source = _BUS_KINDS[name]
+            self._entries.append((key, cls(*params), source))
+            self._values[key] = math.nan
+        return key
+
+    def advance(self, high: float, low: float, close: float) -> None:
+        """Feed one bar into every registered state."""
+        values = self._values
+        for key, state, source in self._entries:
+            if source == _CLOSE:
+                values[key] = state.update(close)
+            elif source == _HLC:
+                values[key] = state.update(high, low, close)
+            else:
+                values[key] = state.update(high if source == _HIGH else low)
+        self.bars += 1
+
+    def __getitem__(self, key: tuple) -> float:
+        return self._values[key]
+
+    def __len__(self) -> int:
+        return len(self._entries)
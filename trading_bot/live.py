@@ -1,17 +1,23 @@
 # trading_bot/live.py
 from __future__ import annotations
 
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from typing import List, Type, Optional
+import time
 import traceback
 
+import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 
-from .data import fetch_klines
+from . import _kernels
+from .data import _INTERVAL_MS, fetch_klines, fetch_klines_since, KlineStream, websockets
+from .base_strategy import _SIDE_NAMES
 from .strategies import StrategyBase
 from .optimizer import grid_search_one
 from .broker import BinanceBroker
-from .plotting import _plot_one
+from .plotting import _LivePlot
 
 __all__ = ["run_live"]
 
@@ -29,12 +35,97 @@ except Exception:
 from matplotlib.widgets import Button
 
 
-def _latest_completed_bar(symbol: str, interval: str) -> tuple[pd.Timestamp, pd.Series]:
-    df = fetch_klines(symbol, interval=interval, limit=2)
-    ts = df.index[-1]
-    return ts, df.iloc[-1]
-
-
+_OHLCV = ["open", "high", "low", "close", "volume"]
+_HIGH, _LOW, _CLOSE = (_OHLCV.index(c) for c in ("high", "low", "close"))
+
+# Spacing of consecutive bars per interval, to spot gaps in the bar feed
+_BAR_GAP = {iv: pd.Timedelta(milliseconds=ms) for iv, ms in _INTERVAL_MS.items()}
+
+# Intervals without a closed bar from the websocket before REST polling
+# takes over (until the stream delivers again)
+_STREAM_STALE_BARS = 3
+
+
+class _BarWindow:
+    """The most recent ``size`` OHLCV bars in preallocated arrays.
+
+    Bars live in a buffer of ``2 * size`` rows that is appended to at the
+    end; only when it fills up are the newest ``size - 1`` rows moved back to
+    the front. Each :meth:`push` is therefore amortised O(1), and the window
+    is always one contiguous slice, so no wrap-around reassembly is needed
+    when it is read back. Timestamps are kept as integers in the history
+    index's own unit, so :meth:`frame` can view them as ``datetime64``
+    without converting.
+    """
+
+    __slots__ = ("size", "ts", "ohlcv", "start", "end", "tz", "unit", "_frame")
+
+    def __init__(self, df: pd.DataFrame, size: int) -> None:
+        self.size = max(int(size), 1)
+        self.ts = np.empty(2 * self.size, dtype=np.int64)
+        self.ohlcv = np.empty((2 * self.size, len(_OHLCV)), dtype=np.float64)
+        index = pd.DatetimeIndex(df.index)
+        self.tz, self.unit = index.tz, index.unit
+        tail = df.iloc[-self.size:]
+        n = len(tail)
+        self.ts[:n] = index[-n:].asi8 if n else []
+        self.ohlcv[:n] = tail[_OHLCV].to_numpy(dtype=np.float64)
+        self.start, self.end = 0, n
+        self._frame: pd.DataFrame | None = None
+
+    def __len__(self) -> int:
+        return self.end - self.start
+
+    def push(self, ts: pd.Timestamp, values) -> None:
+        """Append one bar (``values`` in open/high/low/close/volume order)."""
+        if self.end == len(self.ts):
+            keep = self.size - 1
+            self.ts[:keep] = self.ts[self.end - keep:self.end]
+            self.ohlcv[:keep] = self.ohlcv[self.end - keep:self.end]
+            self.start, self.end = 0, keep
+        self.ts[self.end] = pd.Timestamp(ts).as_unit(self.unit).asm8.view(np.int64)
+        self.ohlcv[self.end] = values
+        self.end += 1
+        self.start = max(self.start, self.end - self.size)
+        self._frame = None
+
+    def frame(self) -> pd.DataFrame:
+        """The window as a DataFrame.
+
+        Built at most once per :meth:`push` and shared by every caller until
+        the next one; it is a copy, so later pushes leave it untouched.
+        """
+        if self._frame is None:
+            index = pd.DatetimeIndex(self.ts[self.start:self.end].view(f"M8[{self.unit}]"))
+            if self.tz is not None:
+                index = index.tz_localize("UTC").tz_convert(self.tz)
+            self._frame = pd.DataFrame(self.ohlcv[self.start:self.end].copy(), index=index, columns=_OHLCV)
+        return self._frame
+
+    def tail(self, n: int) -> tuple:
+        """``(ts, closes)`` of the last ``n`` bars as numpy views, no DataFrame.
+
+        ``ts`` is ``datetime64`` in UTC. The views share the buffer, so use
+        them before the next :meth:`push`.
+        """
+        lo = max(self.start, self.end - n)
+        return self.ts[lo:self.end].view(f"M8[{self.unit}]"), self.ohlcv[lo:self.end, _CLOSE]
+
+
+def _bars_since(symbol: str, interval: str, last_ts: pd.Timestamp, until: pd.Timestamp | None = None) -> list:
+    """Closed bars after ``last_ts`` (and before ``until``) as ``(ts, values)`` pairs.
+
+    ``values`` is a float64 array in ``_OHLCV`` order.
+    """
+    df = fetch_klines_since(
+        symbol, interval, last_ts.value // 1_000_000 + 1,
+        end_ms=None if until is None else until.value // 1_000_000,
+    )
+    return list(zip(df.index, df[_OHLCV].to_numpy(dtype=np.float64)))
+
+
+# Memoised per class: callers only unpack the result, never mutate it
+@lru_cache(maxsize=None)
 def _defaults_for(cls: Type[StrategyBase]) -> dict:
     n = cls.__name__.lower()
     if "macdrsi" in n:
@@ -61,6 +152,12 @@ def _instantiate_for_mode(
     return [pick(sid=1, **_defaults_for(pick))]
 
 
+def _reoptimise(train: pd.DataFrame, classes: List[Type[StrategyBase]]) -> List[StrategyBase]:
+    """Fresh instances of ``classes`` with parameters grid-searched on ``train``."""
+    return [Cls(sid=i + 1, **grid_search_one(train, Cls, fee=0.001)[0]) for i, Cls in enumerate(classes)]
+
+
+@lru_cache(maxsize=None)
 def _label_for_strategy_class(Cls: Type[StrategyBase]) -> str:
     name = getattr(Cls, "__name__", "Strategy")
     return name.replace("Strategy", "").replace("_", " ").strip()
@@ -114,17 +211,27 @@ def run_live(
         "mode": live_mode,
         "strats": [],                  # list[StrategyBase]
         "broker": None,                # BinanceBroker
-        "df": None,                    # DataFrame OHLCV
+        "bars": None,                  # _BarWindow of OHLCV history
         "last_ts": None,
         "bars_since_opt": 0,
-        "timer": None,
+        "timer": None,                 # logic timer: bars, strategies, orders
+        "ui_timer": None,              # redraws the chart when "dirty"
+        "dirty": False,
+        "reopt": None,                 # Future of a background re-optimisation
         "interval": interval,
         "hist_bars": int(hist_bars),
         "reopt_every": int(reopt_every),
+        "stream": None,                # KlineStream, or None to poll REST
+        "stream_seen": 0.0,            # monotonic time of the stream's last bar
+        "rest_polled": 0.0,            # monotonic time of the last REST poll
     }
 
     def _load_history(sym: str) -> pd.DataFrame:
         df = fetch_klines(sym, interval=state["interval"], limit=state["hist_bars"]).copy()
+        # Leave out the still-forming candle; it arrives closed with the next bars
+        gap = _BAR_GAP.get(state["interval"])
+        if gap is not None:
+            df = df[df.index + gap <= pd.Timestamp.now(tz=df.index.tz)]
         if df.empty:
             raise RuntimeError(f"No history for {sym}")
         return df
@@ -133,9 +240,21 @@ def run_live(
         state["symbol"] = sym.upper()
         state["mode"] = mode
         print(f"[LIVE] reset → {state['symbol']} | mode={state['mode']} | pick={getattr(pick_cls, '__name__', 'auto')}")
-        state["df"] = _load_history(state["symbol"])
-        state["last_ts"] = state["df"].index[-1]
+        df = _load_history(state["symbol"])
+        state["bars"] = _BarWindow(df, state["hist_bars"])
+        state["last_ts"] = df.index[-1]
         state["bars_since_opt"] = 0
+        if state["reopt"] is not None:
+            # A result for the old symbol/strategies must not be swapped in
+            state["reopt"].cancel()
+            state["reopt"] = None
+        if state["stream"] is not None:
+            state["stream"].stop()
+            state["stream"] = None
+        if websockets is not None:
+            # Closed candles arrive over the websocket; the logic timer drains them
+            state["stream"] = KlineStream(state["symbol"], state["interval"]).start()
+            state["stream_seen"] = time.monotonic()
         state["broker"] = BinanceBroker(state["symbol"], fee=0.001, paper=paper, testnet=testnet)
         state["strats"].clear()
         state["strats"].extend(_instantiate_for_mode(strategies_to_try, state["mode"], pick_cls))
@@ -161,6 +280,10 @@ def run_live(
 
     sym_labels = [s.upper() for s in symbols]
     strat_labels = ["[All]"] + [_label_for_strategy_class(Cls) for Cls in strategies_to_try]
+    # Apply resolves the picked label with one lookup; first class wins, as before
+    label_to_cls: dict[str, Type[StrategyBase]] = {}
+    for Cls in strategies_to_try:
+        label_to_cls.setdefault(_label_for_strategy_class(Cls), Cls)
 
     if _WIDGET_DROPDOWN:
         dd_sym = Dropdown(ax_sym, "Symbol", sym_labels, value=state["symbol"])
@@ -178,85 +301,136 @@ def run_live(
     btn_apply = Button(ax_apply, "Apply")
 
     # --- draw helpers ---
+    chart = _LivePlot(ax)
+
+    def _redraw() -> None:
+        ts, closes = state["bars"].tail(600)
+        px = float(closes[-1])
+        chart.draw(ts, closes, state["strats"][0],
+                   f"{state['symbol']}  |  Equity {state['broker'].equity(px):.2f}  |  Pos {state['broker'].position:.6f}")
+
     def _draw_first():
-        ax.clear()
-        tdf = state["df"].tail(600)
-        _plot_one(ax, tdf, state["strats"][0])
-        ax.set_title(f"{state['symbol']}  |  Equity {state['broker'].equity(float(tdf['close'].iloc[-1])):.2f}  |  Pos {state['broker'].position:.6f}")
-        fig.canvas.draw_idle()
+        _redraw()
         plt.pause(0.01)
 
+    # Re-optimisation runs on one worker thread, so a grid search never
+    # stalls the timers (the parallel grid kernels let the main thread run
+    # meanwhile). The new strategies are swapped in on the main thread, by
+    # _swap_reopt at the start of the next tick.
+    _kernels.start_threads()
+    reopt_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="reopt")
+
     def _reopt_short():
+        if state["reopt"] is not None:
+            return
+        train = state["bars"].frame().iloc[-400:]
+        state["reopt"] = reopt_pool.submit(_reoptimise, train, [type(s) for s in state["strats"]])
+
+    def _swap_reopt():
+        fut = state["reopt"]
+        if fut is None or not fut.done():
+            return
+        state["reopt"] = None
         try:
-            look = min(400, len(state["df"]))
-            train = state["df"].iloc[-look:]
-            if state["mode"] == "all":
-                new_list: List[StrategyBase] = []
-                for i, s in enumerate(state["strats"]):
-                    Cls = type(s)
-                    p, _ = grid_search_one(train, Cls, fee=0.001)
-                    new_list.append(Cls(sid=i + 1, **p))
-                state["strats"][:] = new_list
-            else:
-                Cls = type(state["strats"][0])
-                p, _ = grid_search_one(train, Cls, fee=0.001)
-                state["strats"][:] = [Cls(sid=1, **p)]
+            state["strats"][:] = fut.result()
         except Exception:
             traceback.print_exc()
+        state["dirty"] = True
 
     # --- timer tick ---
+    def _on_bar(ts: pd.Timestamp, values: np.ndarray) -> None:
+        # Advances the window and every strategy by one bar; orders are left
+        # to _act, so bars caught up after a gap never trade
+        state["bars"].push(ts, values)
+        px = float(values[_CLOSE])
+        df = state["bars"].frame()
+        state["last_ts"] = ts
+        state["bars_since_opt"] += 1
+
+        cs = df["close"]
+        for s in state["strats"]:
+            s.step(ts, px, cs, df_full=df, high=values[_HIGH], low=values[_LOW])
+
+    def _act(ts: pd.Timestamp, px: float) -> None:
+        # Trade on the strategies' signals for bar ts, the newest one. A
+        # signal is a trade recorded at ts, read straight from the trade arrays
+        ts_ns = pd.Timestamp(ts).value
+        signals = []
+        for s in state["strats"]:
+            n = s._ntrades
+            hit = n and s.trade_ts[n - 1] == ts_ns
+            signals.append(_SIDE_NAMES[s.trade_side[n - 1]] if hit else None)
+        if state["mode"] == "best":
+            action = signals[0]
+        else:
+            buys = sum(sig == "BUY" for sig in signals)
+            sells = sum(sig == "SELL" for sig in signals)
+            action = "BUY" if buys > len(state["strats"]) // 2 else "SELL" if sells > len(state["strats"]) // 2 else None
+
+        if action == "BUY" and state["broker"].position == 0:
+            state["broker"].market_buy(state["broker"].cash / px, price_hint=px)
+        elif action == "SELL" and state["broker"].position > 0:
+            state["broker"].market_sell(state["broker"].position, price_hint=px)
+
+    def _tick_ms() -> int:
+        # Draining the websocket queue is free, so only REST polling waits loop_sec
+        return 250 if state["stream"] is not None else max(200, int(loop_sec * 1000))
+
     def on_tick(*_):
         try:
-            ts, row = _latest_completed_bar(state["symbol"], state["interval"])
-            if ts <= state["last_ts"]:
-                return
-
-            df = state["df"]
-            df.loc[ts, ["open", "high", "low", "close", "volume"]] = [
-                float(row["open"]), float(row["high"]), float(row["low"]),
-                float(row["close"]), float(row["volume"])
-            ]
-            if len(df) > state["hist_bars"]:
-                state["df"] = df = df.iloc[-state["hist_bars"]:]
-            state["last_ts"] = ts
-
-            cs = df["close"]
-            for s in state["strats"]:
-                s.step(ts, float(row["close"]), cs, df_full=df)
-
-            signals = [s.trades[-1][1] if s.trades and s.trades[-1][0] == ts else None for s in state["strats"]]
-            if state["mode"] == "best":
-                action = signals[0]
+            _swap_reopt()
+            # Only bars after last_ts are fetched: the window already holds the rest
+            gap = _BAR_GAP.get(state["interval"])
+            now = time.monotonic()
+            if state["stream"] is not None and state["stream"].bar_closed.is_set():
+                state["stream_seen"] = now
+                new_bars = [
+                    (ts, np.array([row[c] for c in _OHLCV], dtype=np.float64))
+                    for ts, row in state["stream"].pop() if ts > state["last_ts"]
+                ]
+                if new_bars and gap is not None and new_bars[0][0] > state["last_ts"] + gap:
+                    # Bars missed while the stream was down come from REST
+                    first = new_bars[0][0]
+                    new_bars = _bars_since(state["symbol"], state["interval"], state["last_ts"], first) + new_bars
             else:
-                buys = sum(sig == "BUY" for sig in signals)
-                sells = sum(sig == "SELL" for sig in signals)
-                action = "BUY" if buys > len(state["strats"]) // 2 else "SELL" if sells > len(state["strats"]) // 2 else None
-
-            px = float(row["close"])
-            if action == "BUY" and state["broker"].position == 0:
-                state["broker"].market_buy(state["broker"].cash / px, price_hint=px)
-            elif action == "SELL" and state["broker"].position > 0:
-                state["broker"].market_sell(state["broker"].position, price_hint=px)
-
-            tdf = df.tail(600)
-            ax.clear()
-            if state["mode"] == "all":
-                ax.plot(tdf.index, tdf["close"], linewidth=0.7, label="close")
-                for s in state["strats"]:
-                    _plot_one(ax, tdf, s)
-            else:
-                _plot_one(ax, tdf, state["strats"][0])
-
-            ax.set_title(f"{state['symbol']}  |  Equity {state['broker'].equity(px):.2f}  |  Pos {state['broker'].position:.6f}")
-            fig.canvas.draw_idle()
+                if state["stream"] is not None:
+                    # A stream that stays silent (never connects, blocked, ...)
+                    # is backed up by REST, polled every loop_sec
+                    silent = now - state["stream_seen"]
+                    if gap is None or silent < _STREAM_STALE_BARS * gap.total_seconds():
+                        return
+                    if now - state["rest_polled"] < loop_sec:
+                        return
+                    if state["rest_polled"] < state["stream_seen"]:
+                        print(f"[LIVE] no bars from the stream for {silent:.0f}s; polling REST")
+                state["rest_polled"] = now
+                new_bars = _bars_since(state["symbol"], state["interval"], state["last_ts"])
+            new_bars = [(ts, values) for ts, values in new_bars if ts > state["last_ts"]]
+            if not new_bars:
+                return
+            for ts, values in new_bars:
+                _on_bar(ts, values)
+            if len(new_bars) > 1:
+                print(f"[LIVE] caught up {len(new_bars) - 1} missed bar(s); trading on the newest only")
+            ts, values = new_bars[-1]
+            _act(ts, float(values[_CLOSE]))
+            state["dirty"] = True
 
-            state["bars_since_opt"] += 1
             if state["bars_since_opt"] >= state["reopt_every"]:
                 state["bars_since_opt"] = 0
                 _reopt_short()
         except Exception:
             traceback.print_exc()
 
+    def on_ui_tick(*_):
+        if not state["dirty"]:
+            return
+        state["dirty"] = False
+        try:
+            _redraw()
+        except Exception:
+            traceback.print_exc()
+
     # --- widget callbacks ---
     pending = {
         "symbol": state["symbol"],
@@ -282,11 +456,7 @@ def run_live(
             pick_cls = None
             mode = "all"
         else:
-            pick_cls = None
-            for Cls in strategies_to_try:
-                if _label_for_strategy_class(Cls) == label:
-                    pick_cls = Cls
-                    break
+            pick_cls = label_to_cls.get(label)
             mode = "best"
 
         _reset_runtime(pending["symbol"], pick_cls, mode)
@@ -296,7 +466,7 @@ def run_live(
             pass
 
         _draw_first()
-        new_t = fig.canvas.new_timer(interval=max(200, int(loop_sec * 1000)))
+        new_t = fig.canvas.new_timer(interval=_tick_ms())
         new_t.add_callback(on_tick)
         new_t.start()
         state["timer"] = new_t
@@ -313,11 +483,16 @@ def run_live(
 
     # first frame + timer
     _draw_first()
-    timer = fig.canvas.new_timer(interval=max(200, int(loop_sec * 1000)))
+    timer = fig.canvas.new_timer(interval=_tick_ms())
     timer.add_callback(on_tick)
     timer.start()
     state["timer"] = timer
     _OPEN_FIGS[key] = (fig, timer)  # update with timer
+    # The chart is redrawn at up to 10 FPS, independent of the logic timer
+    ui_timer = fig.canvas.new_timer(interval=100)
+    ui_timer.add_callback(on_ui_tick)
+    ui_timer.start()
+    state["ui_timer"] = ui_timer
 
     # on close: stop timer and unregister this figure
     def _on_close(_event):
@@ -326,6 +501,11 @@ def run_live(
             try: t.stop()
             except Exception: pass
             state["timer"] = None
+        state["ui_timer"].stop()
+        reopt_pool.shutdown(wait=False, cancel_futures=True)
+        if state["stream"] is not None:
+            state["stream"].stop()
+            state["stream"] = None
         _OPEN_FIGS.pop(state["symbol"], None)
         print(f"[LIVE] closed {state['symbol']} window")
 
@@ -4,21 +4,37 @@ Parameter optimisation utilities for trading strategies.
 This module provides functions to evaluate strategy performance using
 a custom scoring function and to search a parameter grid for the best
 configuration. These functions are used by the CLI to find the
-optimal parameters for each built‑in strategy.
+optimal parameters for each built‑in strategy. Strategies with a compiled
+kernel evaluate their whole grid in a single parallel kernel call.
 """
 
 from __future__ import annotations
 
+import hashlib
+import multiprocessing
+import os
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 from typing import Any, Dict, Tuple, List
 
 import numpy as np
 import pandas as pd
 
+from . import _kernels
 from .strategies import StrategyBase  # type: ignore
-from .backtest import run_backtest_multi
+from .backtest import _price_arrays, run_backtest_multi
 
 __all__ = ["score_metrics", "grid_search_one"]
 
+# Below this many bar-steps (combinations x bars) starting worker processes
+# costs more than it saves, so small grids are scored in-process.
+_POOL_MIN_STEPS = 200_000
+
+# LRU memo of grid_search_one results, see _frame_key()
+_GRID_CACHE: "OrderedDict[tuple, Tuple[Dict[str, Any], Dict[str, Any]]]" = OrderedDict()
+_GRID_CACHE_SIZE = 64
+
 
 def score_metrics(
     m: Dict[str, Any],
@@ -59,6 +75,25 @@ def score_metrics(
     return 0.6 * sharpe + 0.4 * (cagr * 100) - 2.0 * (maxdd * 100)
 
 
+def _score_columns(
+    trades: np.ndarray,
+    cagr: np.ndarray,
+    max_dd: np.ndarray,
+    sharpe: np.ndarray,
+    min_trades: int,
+    max_dd_cap: float,
+) -> np.ndarray:
+    """:func:`score_metrics` over whole metric columns at once.
+
+    Same rules and operation order as the scalar version, so the scores
+    match it exactly (NaN metrics included).
+    """
+    with np.errstate(invalid="ignore", over="ignore"):
+        score = 0.6 * sharpe + 0.4 * (cagr * 100) - 2.0 * (max_dd * 100)
+        rejected = (trades < min_trades) | (cagr <= 0) | (max_dd > max_dd_cap)
+    return np.where(rejected, -1e9, score)
+
+
 def grid_search_one(
     df: pd.DataFrame,
     StrategyCls: type[StrategyBase],
@@ -66,12 +101,16 @@ def grid_search_one(
     fee: float = 0.001,
     min_trades: int = 6,
     max_dd_cap: float = 0.25,
+    max_workers: int | None = None,
+    coarse_to_fine: bool = False,
 ) -> Tuple[Dict[str, Any], Dict[str, Any]]:
     """Perform a simple parameter grid search for a single strategy.
 
     For each parameter combination returned by ``StrategyCls.grid()``, this
     function runs a backtest and scores the results. The best parameters by
     the scoring function are returned along with the associated metrics.
+    Results are memoised per strategy class, data and scoring settings, so
+    repeating a search on unchanged data returns immediately.
 
     Parameters
     ----------
@@ -85,29 +124,212 @@ def grid_search_one(
         Minimum trades required to be considered. Default 6.
     max_dd_cap : float, optional
         Maximum drawdown allowed. Default 0.25.
+    max_workers : int, optional
+        Worker processes for strategies without a compiled kernel. Defaults
+        to the CPU count. Small grids, or a single worker, run in-process.
+    coarse_to_fine : bool, optional
+        Score every second value along each parameter axis first, then only
+        the combinations within one step of the coarse winner on every axis.
+        Much cheaper on large grids, but may miss the exhaustive optimum.
+        Default False.
 
     Returns
     -------
     tuple
         A tuple of (best_params_dict, metrics_dict) for the best score.
     """
+    # Identical requests (e.g. a live re-optimisation on an unchanged window)
+    # are answered from the memo
+    key = (StrategyCls, _frame_key(df), fee, min_trades, max_dd_cap, coarse_to_fine)
+    hit = _GRID_CACHE.get(key)
+    if hit is None:
+        hit = _grid_search(df, StrategyCls, fee, min_trades, max_dd_cap, max_workers, coarse_to_fine)
+        _GRID_CACHE[key] = hit
+        if len(_GRID_CACHE) > _GRID_CACHE_SIZE:
+            _GRID_CACHE.popitem(last=False)
+    else:
+        _GRID_CACHE.move_to_end(key)
+    return dict(hit[0]), dict(hit[1])
+
+
+def _frame_key(df: pd.DataFrame) -> str:
+    """Digest of everything a backtest reads from ``df``.
+
+    Covers the timestamps (they set the test duration, hence CAGR) and the
+    close/high/low columns. Hashing ~1000 bars is microseconds, far cheaper
+    than any grid search.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    h.update(pd.DatetimeIndex(df.index).as_unit("ns").asi8.tobytes())
+    for col in ("close", "high", "low"):
+        if col in df:
+            h.update(col.encode())
+            h.update(np.ascontiguousarray(df[col].to_numpy(dtype=np.float64)).tobytes())
+    return h.hexdigest()
+
+
+def _grid_search(
+    df: pd.DataFrame,
+    StrategyCls: type[StrategyBase],
+    fee: float,
+    min_trades: int,
+    max_dd_cap: float,
+    max_workers: int | None,
+    coarse_to_fine: bool,
+) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """Uncached body of :func:`grid_search_one`."""
+    grid = list(_param_grid(StrategyCls, fee))
+    # Unscored combinations keep the reject score, so they are never picked
+    scores = np.full(len(grid), -1e9)
+    scored = np.zeros(len(grid), dtype=bool)
+
+    def score(idx: np.ndarray) -> None:
+        scores[idx] = _score_params(
+            df, StrategyCls, [grid[i] for i in idx.tolist()], min_trades, max_dd_cap, max_workers
+        )
+        scored[idx] = True
+
+    if coarse_to_fine and len(grid) > 1:
+        pos = _axis_positions(grid)
+        score(np.flatnonzero((pos % 2 == 0).all(axis=1)))
+        if scores.max() > -1e9:
+            near = (np.abs(pos - pos[int(np.argmax(scores))]) <= 1).all(axis=1)
+            score(np.flatnonzero(near & ~scored))
+        else:
+            # Nothing in the coarse pass qualified: fall back to the full grid
+            score(np.flatnonzero(~scored))
+    else:
+        score(np.arange(len(grid)))
     best_params: Dict[str, Any] | None = None
-    best_metrics: Dict[str, Any] | None = None
     best_score = -1e9
-    for params in StrategyCls.grid(fee=fee):
-        strat = StrategyCls(sid=1, **params)  # sid is irrelevant for optimisation
-        closes: list[float] = []
-        # Run backtest inline to avoid overhead of run_backtest_multi for each param
-        for ts, row in df.iterrows():
-            px = row["close"]
-            if np.isnan(px):
-                continue
-            closes.append(px)
-            cs = pd.Series(closes, index=df.index[: len(closes)])
-            strat.step(ts, px, cs, df_full=df.iloc[: len(closes)])
-        m = strat.metrics()
-        sc = score_metrics(m, min_trades=min_trades, max_dd_cap=max_dd_cap)
+    # Grid order, so ties still go to the earliest combination
+    for params, sc in zip(grid, scores.tolist()):
         if sc > best_score:
-            best_params, best_metrics, best_score = params, m, sc
-    assert best_params is not None and best_metrics is not None
-    return best_params, best_metrics
\ No newline at end of file
+            best_params, best_score = params, sc
+    assert best_params is not None
+    # Report the winner as a standalone run (sid 1), as before
+    best_metrics = run_backtest_multi(df, [(StrategyCls, best_params)])[0].metrics()
+    return best_params, best_metrics
+
+
+@lru_cache(maxsize=None)
+def _param_grid(StrategyCls: type[StrategyBase], fee: float) -> Tuple[Dict[str, Any], ...]:
+    """``StrategyCls.grid(fee=fee)``, built once per class and fee.
+
+    The MACD/RSI grid alone is ~2000 dicts. The dicts are shared between
+    searches, so they are only read (best parameters leave
+    :func:`grid_search_one` as copies).
+    """
+    return tuple(StrategyCls.grid(fee=fee))
+
+
+def _axis_positions(grid: List[Dict[str, Any]]) -> np.ndarray:
+    """``pos[k, a]``: index of combination ``k``'s value along parameter axis ``a``.
+
+    Each axis lists a parameter's distinct values in order of first
+    appearance in ``grid``, which for the built-in grids is ascending.
+    """
+    cols = []
+    for key in grid[0]:
+        values = [p[key] for p in grid]
+        order = {v: i for i, v in enumerate(dict.fromkeys(values))}
+        cols.append([order[v] for v in values])
+    return np.array(cols, dtype=np.int64).T
+
+
+def _score_params(
+    df: pd.DataFrame,
+    StrategyCls: type[StrategyBase],
+    grid: List[Dict[str, Any]],
+    min_trades: int,
+    max_dd_cap: float,
+    max_workers: int | None,
+) -> List[float]:
+    """Score each parameter dict in ``grid`` on ``df``, in grid order."""
+    if not grid:
+        return []
+    if StrategyCls.__dict__.get("_kernel_name") is not None and _kernels.HAVE_KERNELS:
+        return _score_kernel(df, StrategyCls, grid, min_trades, max_dd_cap)
+    workers = min(len(grid), max_workers or os.cpu_count() or 1)
+    if workers <= 1 or len(grid) * len(df) < _POOL_MIN_STEPS:
+        return _score_grid(df, StrategyCls, grid, min_trades, max_dd_cap)
+    # Contiguous chunks keep the scores in grid order, so ties still go
+    # to the earliest combination. The frame is pickled once per chunk.
+    bounds = np.linspace(0, len(grid), workers + 1).astype(int)
+    chunks = [grid[a:b] for a, b in zip(bounds[:-1], bounds[1:])]
+    # Spawn rather than fork: numba's threading layer is not fork-safe
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as ex:
+        futures = [
+            ex.submit(_score_grid, df, StrategyCls, chunk, min_trades, max_dd_cap) for chunk in chunks
+        ]
+        return [sc for fut in futures for sc in fut.result()]
+
+
+def _score_grid(
+    df: pd.DataFrame,
+    StrategyCls: type[StrategyBase],
+    grid: List[Dict[str, Any]],
+    min_trades: int,
+    max_dd_cap: float,
+) -> List[float]:
+    """Score each parameter dict in ``grid`` by stepping it over ``df``.
+
+    All combinations go through one :func:`run_backtest_multi` pass, so the
+    bars are read once and indicators shared between combinations are
+    updated once per bar. Module-level so it can run in a worker process.
+    """
+    strats = run_backtest_multi(df, [(StrategyCls, p) for p in grid])
+    cols = np.array(
+        [
+            (m.get("trades", 0), m.get("cagr", 0.0), m.get("max_dd", 1.0), m.get("sharpe", 0.0))
+            for m in (s.metrics() for s in strats)
+        ],
+        dtype=np.float64,
+    ).reshape(-1, 4)
+    return _score_columns(*cols.T, min_trades, max_dd_cap).tolist()
+
+
+def _kernel_param_rows(StrategyCls: type[StrategyBase], grid: List[Dict[str, Any]]) -> List[tuple]:
+    """The kernel parameter vector of every combination in ``grid``.
+
+    Classes that support ``reset(**params)`` reuse one instance for the
+    whole grid rather than constructing one per combination. Parameters
+    a combination leaves out would keep the previous combination's value
+    there, so that is only done when every combination sets the same ones.
+    """
+    keys = grid[0].keys()
+    if not StrategyCls.__dict__.get("_supports_reset", False) or any(p.keys() != keys for p in grid):
+        return [StrategyCls(sid=1, **p)._kernel_params() for p in grid]
+    strat = StrategyCls(sid=1, **grid[0])
+    rows = []
+    for p in grid:
+        strat.reset(**p)
+        rows.append(strat._kernel_params())
+    return rows
+
+
+def _score_kernel(
+    df: pd.DataFrame,
+    StrategyCls: type[StrategyBase],
+    grid: List[Dict[str, Any]],
+    min_trades: int,
+    max_dd_cap: float,
+) -> List[float]:
+    """:func:`_score_grid` for strategies with a compiled kernel.
+
+    The whole grid runs as one ``params[K, P]`` block through the strategy's
+    grid kernel, which returns the metrics of every combination; the full
+    metrics dict is only built for the winner, by :func:`_grid_search`.
+    """
+    df, highs, lows, closes = _price_arrays(df)
+    assert len(closes) > 0
+    ts_ns = pd.DatetimeIndex(df.index).as_unit("ns").asi8
+    params = np.array(_kernel_param_rows(StrategyCls, grid), dtype=np.float64)
+    # Rows past the drawdown cap are rejected by score_metrics anyway, so the
+    # kernel may stop simulating them there
+    rows = _kernels.run_grid(StrategyCls._kernel_name, highs, lows, closes, ts_ns, params, max_dd_cap)
+    col = {name: rows[:, i] for i, name in enumerate(_kernels.GRID_METRICS)}
+    return _score_columns(
+        col["trades"], col["cagr"], col["max_dd"], col["sharpe"], min_trades, max_dd_cap
+    ).tolist()
@@ -10,12 +10,18 @@ from __future__ import annotations
 
 import matplotlib.pyplot as plt
 import matplotlib.dates as mdates
+import numpy as np
+import pandas as pd
 
-from .base_strategy import StrategyBase
+from .base_strategy import _SIDE_NAMES, StrategyBase
 from typing import List, Dict
 
 __all__ = ["plot_with_numbered_trades", "_plot_one"]
 
+# Close lines longer than this are drawn LTTB-downsampled to _LINE_POINTS
+_LINE_MAX_POINTS = 800
+_LINE_POINTS = 400
+
 
 def _pair_trades(trades: List[tuple], fee: float) -> List[Dict[str, float]]:
     """Return a list of dictionaries for consecutive BUY->SELL pairs.
@@ -24,37 +30,46 @@ def _pair_trades(trades: List[tuple], fee: float) -> List[Dict[str, float]]:
     proceeds, net PnL, percent PnL, and total fees paid. Only closed pairs
     are considered; an unmatched BUY at the end is ignored.
     """
-    out = []
-    i = 0
-    n = len(trades)
-    while i + 1 < n:
-        b = trades[i]
-        s = trades[i + 1]
-        if b[1] == "BUY" and s[1] == "SELL":
-            _, _, pb, qb, _ = b
-            _, _, ps, qs, _ = s
-            qty = min(qb, qs) if qs > 0 else qb
-            cost = qty * pb * (1 + fee)
-            proceeds = qty * ps * (1 - fee)
-            pnl_abs = proceeds - cost
-            pnl_pct = (proceeds / cost - 1.0) * 100.0
-            fees_abs = qty * pb * fee + qty * ps * fee
-            out.append(
-                dict(
-                    buy=b,
-                    sell=s,
-                    qty=qty,
-                    cost=cost,
-                    proceeds=proceeds,
-                    pnl_abs=pnl_abs,
-                    pnl_pct=pnl_pct,
-                    fees=fees_abs,
-                )
-            )
-            i += 2
-        else:
-            i += 1
-    return out
+    if len(trades) < 2:
+        return []
+    # One pass over the columns; BUY->SELL pairs cannot overlap, so every
+    # adjacent match is a pair
+    _, sides, pxs, qtys, _ = zip(*trades)
+    sides = np.array(sides)
+    pxs = np.array(pxs, dtype=np.float64)
+    qtys = np.array(qtys, dtype=np.float64)
+    i_buy = np.flatnonzero((sides[:-1] == "BUY") & (sides[1:] == "SELL"))
+    i_sell = i_buy + 1
+    pb, ps = pxs[i_buy], pxs[i_sell]
+    qb, qs = qtys[i_buy], qtys[i_sell]
+    qty = np.where(qs > 0, np.minimum(qb, qs), qb)
+    cost = qty * pb * (1 + fee)
+    proceeds = qty * ps * (1 - fee)
+    pnl_abs = proceeds - cost
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pnl_pct = (proceeds / cost - 1.0) * 100.0
+    fees_abs = qty * pb * fee + qty * ps * fee
+    return [
+        dict(
+            buy=trades[b],
+            sell=trades[b + 1],
+            qty=q,
+            cost=c,
+            proceeds=pr,
+            pnl_abs=pa,
+            pnl_pct=pp,
+            fees=fa,
+        )
+        for b, q, c, pr, pa, pp, fa in zip(
+            i_buy.tolist(),
+            qty.tolist(),
+            cost.tolist(),
+            proceeds.tolist(),
+            pnl_abs.tolist(),
+            pnl_pct.tolist(),
+            fees_abs.tolist(),
+        )
+    ]
 
 
 def _format_money(x: float) -> str:
@@ -63,6 +78,67 @@ def _format_money(x: float) -> str:
     return f"{sign}${abs(x):,.2f}"
 
 
+def _summary_text(last_px: float, strategy_obj: StrategyBase, pairs: List[Dict[str, float]]) -> str:
+    """Realised/unrealised PnL at ``last_px``, fees and equity for the box in the plot corner."""
+    realized = sum(p["pnl_abs"] for p in pairs)
+    total_fees = sum(p["fees"] for p in pairs)
+    # Unrealised PnL if open
+    unrealized = 0.0
+    # Read from the trade arrays: this runs on every blitted live frame
+    n = strategy_obj._ntrades
+    if n and _SIDE_NAMES[strategy_obj.trade_side[n - 1]] == "BUY":
+        pb, qb = strategy_obj.trade_price[n - 1], strategy_obj.trade_qty[n - 1]
+        unrealized = float(qb * (last_px - pb * (1 + strategy_obj.fee)))
+    final_eq = strategy_obj.metrics().get("final_equity", 0.0)
+    return (
+        f"Realized {_format_money(realized)}   |   "
+        f"Unrealized {_format_money(unrealized)}   |   "
+        f"Fees {_format_money(-total_fees)}\n"
+        f"Total {_format_money(realized + unrealized)}   |   "
+        f"Equity ${final_eq:,.2f}"
+    )
+
+
+def _lttb(xs: np.ndarray, ys: np.ndarray, n_out: int) -> np.ndarray:
+    """Indices of ``n_out`` points picked by Largest-Triangle-Three-Buckets.
+
+    The first and last points are kept; the rest are split into ``n_out - 2``
+    buckets and from each the point spanning the largest triangle with the
+    previously kept point and the mean of the next bucket is taken. This
+    keeps the peaks and troughs a plain stride would drop.
+    """
+    n = len(xs)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    # Bucket b covers [edges[b], edges[b + 1]); the last "bucket" is the end point
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    counts = np.diff(np.append(edges, n))
+    mean_x = np.add.reduceat(xs, edges) / counts
+    mean_y = np.add.reduceat(ys, edges) / counts
+    out = np.empty(n_out, dtype=np.int64)
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for b in range(n_out - 2):
+        lo, hi = edges[b], edges[b + 1]
+        ax_, ay = xs[a], ys[a]
+        area = np.abs((ax_ - mean_x[b + 1]) * (ys[lo:hi] - ay) - (ax_ - xs[lo:hi]) * (mean_y[b + 1] - ay))
+        a = lo + int(np.argmax(area))
+        out[b + 1] = a
+    return out
+
+
+def _close_line(ts, closes: np.ndarray) -> tuple:
+    """x/y data for the close line, LTTB-downsampled for long series.
+
+    ``ts`` is a ``DatetimeIndex`` or a ``datetime64`` array.
+    """
+    if len(closes) <= _LINE_MAX_POINTS:
+        return ts, closes
+    x = pd.DatetimeIndex(ts).asi8.astype(np.float64)
+    idx = _lttb(x - x[0], np.asarray(closes, dtype=np.float64), _LINE_POINTS)
+    return ts[idx], closes[idx]
+
+
 def _plot_one(ax: plt.Axes, df, strategy_obj: StrategyBase) -> None:
     """Plot a single strategy's trades and PnL on an axis.
 
@@ -75,36 +151,58 @@ def _plot_one(ax: plt.Axes, df, strategy_obj: StrategyBase) -> None:
     strategy_obj : StrategyBase
         Strategy instance with recorded trades and equity.
     """
+    _plot_one_np(ax, df.index, df["close"].to_numpy(dtype=np.float64), strategy_obj)
+
+
+def _plot_one_np(ax: plt.Axes, times, closes: np.ndarray, strategy_obj: StrategyBase) -> None:
+    """:func:`_plot_one` from bar timestamps and closes instead of a DataFrame.
+
+    ``times`` is a ``DatetimeIndex`` or a ``datetime64`` array (read as UTC).
+    """
     ax.clear()
-    ax.plot(df.index, df["close"], linewidth=0.7, label="close")
+    ax.plot(*_close_line(times, closes), linewidth=0.7, label="close")
     
     #ax.xaxis.set_major_formatter(mdates.DateFormatter('%d.%m.%Y'))
     ax.xaxis.set_major_formatter(mdates.DateFormatter('%d.%m.%Y %H:%M'))
 
-    # Plot markers with numbered labels
-    for (t, side, price, qty, sid) in strategy_obj.trades:
-        ax.scatter(t, price, s=28, c=("green" if side == "BUY" else "red"), marker=("^" if side == "BUY" else "v"), zorder=3)
-        ax.text(
+    _plot_trades(ax, times, closes, strategy_obj)
+    ax.legend(loc="upper left")
+    ax.figure.autofmt_xdate()
+    ax.figure.canvas.draw_idle()
+
+
+def _plot_trades(ax: plt.Axes, times, closes: np.ndarray, strategy_obj: StrategyBase) -> list:
+    """Draw ``strategy_obj``'s trade markers and labels, PnL box and title.
+
+    Returns the artists added (the PnL box is the last text on ``ax``), so
+    :class:`_ViewerPlot` can swap them for another strategy's.
+    """
+    artists = []
+    trades = strategy_obj.trades
+    # One marker collection per side, each trade numbered
+    for side, color, marker in (("BUY", "green", "^"), ("SELL", "red", "v")):
+        pts = [(t, price) for (t, sd, price, _, _) in trades if sd == side]
+        if pts:
+            t, price = zip(*pts)
+            artists.append(ax.scatter(t, price, s=28, c=color, marker=marker, zorder=3))
+    for (t, side, price, qty, sid) in trades:
+        artists.append(ax.text(
             t,
             price * (1.0006 if side == "BUY" else 0.9994),
             str(sid),
             fontsize=7,
             ha="center",
             va=("bottom" if side == "BUY" else "top"),
-        )
+        ))
     # Fee‑aware per‑pair labels
-    pairs = _pair_trades(strategy_obj.trades, strategy_obj.fee)
-    realized = 0.0
-    total_fees = 0.0
+    pairs = _pair_trades(trades, strategy_obj.fee)
     for p in pairs:
         tb, _, pb, _, _ = p["buy"]
         ts, _, ps, _, _ = p["sell"]
         t_mid = tb + (ts - tb) / 2
         p_mid = (pb + ps) / 2
-        realized += p["pnl_abs"]
-        total_fees += p["fees"]
         color = "green" if p["pnl_abs"] >= 0 else "red"
-        ax.text(
+        artists.append(ax.text(
             t_mid,
             p_mid,
             f"{_format_money(p['pnl_abs'])}\n{p['pnl_pct']:+.2f}%",
@@ -113,35 +211,125 @@ def _plot_one(ax: plt.Axes, df, strategy_obj: StrategyBase) -> None:
             va="center",
             color=color,
             bbox=dict(boxstyle="round,pad=0.2", fc="white", ec=color, lw=0.6, alpha=0.85),
-        )
-    # Unrealised PnL if open
-    unrealized = 0.0
-    if strategy_obj.trades and strategy_obj.trades[-1][1] == "BUY":
-        last_buy = strategy_obj.trades[-1]
-        _, _, pb, qb, _ = last_buy
-        last_px = float(df["close"].iloc[-1])
-        unrealized = qb * (last_px - pb * (1 + strategy_obj.fee))
-    m = strategy_obj.metrics()
-    final_eq = m.get("final_equity", 0.0)
-    total_pnl_calc = realized + unrealized
-    ax.text(
+        ))
+    artists.append(ax.text(
         0.995,
         0.02,
-        f"Realized {_format_money(realized)}   |   "
-        f"Unrealized {_format_money(unrealized)}   |   "
-        f"Fees {_format_money(-total_fees)}\n"
-        f"Total {_format_money(total_pnl_calc)}   |   "
-        f"Equity ${final_eq:,.2f}",
+        _summary_text(float(closes[-1]), strategy_obj, pairs),
         transform=ax.transAxes,
         ha="right",
         va="bottom",
         bbox=dict(boxstyle="round,pad=0.25", fc="white", ec="#777", lw=0.6, alpha=0.9),
         fontsize=8,
-    )
-    ax.set_title(f"{strategy_obj.name}  |  {df.index[0].date()} → {df.index[-1].date()}")
-    ax.legend(loc="upper left")
-    ax.figure.autofmt_xdate()
-    ax.figure.canvas.draw_idle()
+    ))
+    ax.set_title(f"{strategy_obj.name}  |  {pd.Timestamp(times[0]).date()} → {pd.Timestamp(times[-1]).date()}")
+    return artists
+
+
+class _ViewerPlot:
+    """The backtest viewer's chart of one strategy over one symbol's bars.
+
+    Switching to another strategy on the same bars keeps the axes and the
+    close line and only swaps the trade artists; a new frame (another
+    symbol) is drawn from scratch by :func:`_plot_one`.
+    """
+
+    def __init__(self, ax: plt.Axes) -> None:
+        self.ax = ax
+        self._df = None
+        self._trades: list = []
+
+    def draw(self, df, strategy_obj: StrategyBase) -> None:
+        """Show ``strategy_obj``'s trades over ``df`` on the axes."""
+        ax = self.ax
+        if df is not self._df:
+            _plot_one(ax, df, strategy_obj)
+            self._df = df
+            # Every collection and text on the freshly cleared axes
+            self._trades = [*ax.collections, *ax.texts]
+            return
+        for artist in self._trades:
+            artist.remove()
+        self._trades = _plot_trades(ax, df.index, df["close"].to_numpy(dtype=np.float64), strategy_obj)
+        ax.figure.canvas.draw_idle()
+
+
+class _LivePlot:
+    """A live chart of one strategy that is blitted between full redraws.
+
+    :meth:`draw` takes the bars as numpy arrays and falls back to a full
+    :func:`_plot_one_np` when the strategy or
+    its trade count changes, or the new bars leave the axis limits. Between
+    those, only the price line, the PnL box and the title change: they are
+    animated artists updated in place and blitted over the background cached
+    at the last full draw, so the axes, ticks and trade labels are not
+    rebuilt every tick.
+    """
+
+    def __init__(self, ax: plt.Axes) -> None:
+        self.ax = ax
+        self._strategy: StrategyBase | None = None
+        self._ntrades = -1
+        self._pairs: List[Dict[str, float]] = []
+        self._bg = None
+        ax.figure.canvas.mpl_connect("draw_event", self._on_draw)
+
+    def _artists(self) -> list:
+        # _plot_one_np draws the close line first and the PnL box last
+        return [self.ax.lines[0], self.ax.texts[-1], self.ax.title]
+
+    def _on_draw(self, _event) -> None:
+        if self._strategy is None:
+            return
+        canvas = self.ax.figure.canvas
+        self._bg = canvas.copy_from_bbox(self.ax.figure.bbox)
+        for artist in self._artists():
+            self.ax.draw_artist(artist)
+
+    def draw(self, ts: np.ndarray, closes: np.ndarray, strategy_obj: StrategyBase, title: str) -> None:
+        """Show the bars (``datetime64`` ``ts`` and ``closes``) and ``strategy_obj``'s
+        trades with ``title`` on the axes."""
+        ax = self.ax
+        canvas = ax.figure.canvas
+        ntrades = strategy_obj._ntrades
+        x_last = mdates.date2num(ts[-1])
+        x_lo, x_hi = ax.get_xlim()
+        y_lo, y_hi = ax.get_ylim()
+        if (
+            strategy_obj is not self._strategy
+            or ntrades != self._ntrades
+            or self._bg is None
+            or not canvas.supports_blit
+            or x_last > x_hi
+            or closes.min() < y_lo
+            or closes.max() > y_hi
+        ):
+            self._full_draw(ts, closes, strategy_obj, title)
+            return
+        line, summary, title_artist = self._artists()
+        line.set_data(*_close_line(ts, closes))
+        summary.set_text(_summary_text(float(closes[-1]), strategy_obj, self._pairs))
+        title_artist.set_text(title)
+        canvas.restore_region(self._bg)
+        for artist in (line, summary, title_artist):
+            ax.draw_artist(artist)
+        canvas.blit(ax.figure.bbox)
+        canvas.flush_events()
+
+    def _full_draw(self, ts: np.ndarray, closes: np.ndarray, strategy_obj: StrategyBase, title: str) -> None:
+        ax = self.ax
+        _plot_one_np(ax, ts, closes, strategy_obj)
+        ax.set_title(title)
+        self._strategy = strategy_obj
+        self._ntrades = strategy_obj._ntrades
+        self._pairs = _pair_trades(strategy_obj.trades, strategy_obj.fee)
+        self._bg = None
+        # Leave room on the right so the next bars can be blitted in
+        x0, x1 = mdates.date2num(ts[0]), mdates.date2num(ts[-1])
+        ax.set_xlim(right=x1 + 0.1 * max(x1 - x0, 1e-9))
+        for artist in self._artists():
+            artist.set_animated(True)
+        ax.figure.canvas.draw_idle()
 
 
 def plot_with_numbered_trades(df, strategies: List[StrategyBase], title_suffix: str = "") -> None:
@@ -161,7 +349,7 @@ def plot_with_numbered_trades(df, strategies: List[StrategyBase], title_suffix:
         Additional text to append to the figure title.
     """
     fig, ax = plt.subplots()
-    ax.plot(df.index, df["close"], linewidth=0.7, label="close")
+    ax.plot(*_close_line(df.index, df["close"].to_numpy(dtype=np.float64)), linewidth=0.7, label="close")
     for s in strategies:
         for (t, side, price, qty, sid) in s.trades:
             ax.scatter(t, price, s=28, c=("green" if side == "BUY" else "red"), marker=("^" if side == "BUY" else "v"), zorder=3)
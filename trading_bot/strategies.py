@@ -19,10 +19,11 @@ a list of parameter dictionaries for grid search optimisation.
 
 from __future__ import annotations
 
+import math
+
 import numpy as np
 import pandas as pd
 from .base_strategy import StrategyBase
-from .indicators import rsi, macd, sma, atr
 
 __all__ = [
     "MACDRSI",
@@ -35,6 +36,9 @@ __all__ = [
 class MACDRSI(StrategyBase):
     """MACD and RSI based trading strategy with trailing stop."""
 
+    _kernel_name = "macdrsi"
+    _supports_reset = True
+
     def __init__(
         self,
         sid: int,
@@ -58,20 +62,31 @@ class MACDRSI(StrategyBase):
         super().__init__(sid, f"{sid}: MACD+RSI", fee=fee)
 
     def _after_reset(self) -> None:
-        self.high_since_entry: float | None = None
+        self.high_since_entry = -math.inf
+        # Grid combinations sharing the three spans share one signal line
+        self._k_hist = self._bus.register("macd_hist", self.macd_fast, self.macd_slow, self.macd_signal)
+        self._k_rsi = self._bus.register("rsi", self.rsi_period)
+        self._md_now = self._md_prev = math.nan
+        self._rsi_now = math.nan
+
+    def _update_indicators(self, price: float, high: float, low: float) -> None:
+        bus = self._bus
+        self._md_prev, self._md_now = self._md_now, bus[self._k_hist]
+        self._rsi_now = bus[self._k_rsi]
 
     def _decide(self, ts: pd.Timestamp, price: float, close: pd.Series, df_full: pd.DataFrame | None = None) -> str | None:
-        m, s, _ = macd(close, self.macd_fast, self.macd_slow, self.macd_signal)
-        if len(m) < 3:
+        if self._bars_seen < 3:
             return None
-        md_now = m.iloc[-1] - s.iloc[-1]
-        md_prev = m.iloc[-2] - s.iloc[-2]
-        rsi_now = rsi(close, self.rsi_period).iloc[-1]
+        md_now = self._md_now
+        md_prev = self._md_prev
+        rsi_now = self._rsi_now
         if self.position > 0:
-            self.high_since_entry = max(self.high_since_entry or price, price)
-            trail_stop = self.high_since_entry * (1 - self.trail_pct)
+            high = self.high_since_entry
+            if price > high:
+                self.high_since_entry = high = price
+            trail_stop = high * (1 - self.trail_pct)
             if (md_now < 0 and md_prev > 0) or rsi_now >= self.rsi_sell or price <= trail_stop:
-                self.high_since_entry = None
+                self.high_since_entry = -math.inf
                 return "SELL"
         else:
             if (md_now > 0 and md_prev < 0) and rsi_now >= self.rsi_buy:
@@ -79,6 +94,10 @@ class MACDRSI(StrategyBase):
                 return "BUY"
         return None
 
+    def _kernel_params(self) -> tuple[float, ...]:
+        return (self.macd_fast, self.macd_slow, self.macd_signal, self.rsi_period,
+                self.rsi_buy, self.rsi_sell, self.trail_pct, self.fee, self.start_cash)
+
     @staticmethod
     def grid(fee: float = 0.001) -> list[dict[str, float | int]]:
         """Return a grid of parameter combinations for optimisation."""
@@ -108,6 +127,9 @@ class MACDRSI(StrategyBase):
 class SMACross(StrategyBase):
     """Simple Moving Average crossover strategy with RSI filter and trailing stop."""
 
+    _kernel_name = "smacross"
+    _supports_reset = True
+
     def __init__(
         self,
         sid: int,
@@ -127,24 +149,34 @@ class SMACross(StrategyBase):
         super().__init__(sid, f"{sid}: SMA Cross", fee=fee)
 
     def _after_reset(self) -> None:
-        self.high_since_entry: float | None = None
+        self.high_since_entry = -math.inf
+        self._k_fast = self._bus.register("sma", self.fast)
+        self._k_slow = self._bus.register("sma", self.slow)
+        self._k_rsi = self._bus.register("rsi", self.rsi_period)
+        self._c_now = self._c_prev = math.nan
+        self._rsi_now = math.nan
+
+    def _update_indicators(self, price: float, high: float, low: float) -> None:
+        bus = self._bus
+        self._c_prev, self._c_now = self._c_now, bus[self._k_fast] - bus[self._k_slow]
+        self._rsi_now = bus[self._k_rsi]
 
     def _decide(self, ts: pd.Timestamp, price: float, close: pd.Series, df_full: pd.DataFrame | None = None) -> str | None:
-        if len(close) < max(self.fast, self.slow) + 2:
+        if self._bars_seen < max(self.fast, self.slow) + 2:
             return None
-        s_fast = sma(close, self.fast)
-        s_slow = sma(close, self.slow)
-        c_now = s_fast.iloc[-1] - s_slow.iloc[-1]
-        c_prev = s_fast.iloc[-2] - s_slow.iloc[-2]
-        r = rsi(close, self.rsi_period).iloc[-1]
+        c_now = self._c_now
+        c_prev = self._c_prev
+        r = self._rsi_now
         if self.position > 0:
-            self.high_since_entry = max(self.high_since_entry or price, price)
+            high = self.high_since_entry
+            if price > high:
+                self.high_since_entry = high = price
             if (
-                price <= self.high_since_entry * (1 - self.trail_pct)
+                price <= high * (1 - self.trail_pct)
                 or (c_now < 0 and c_prev > 0)
                 or r > 70
             ):
-                self.high_since_entry = None
+                self.high_since_entry = -math.inf
                 return "SELL"
         else:
             if c_now > 0 and c_prev < 0 and r >= self.rsi_filter:
@@ -152,6 +184,10 @@ class SMACross(StrategyBase):
                 return "BUY"
         return None
 
+    def _kernel_params(self) -> tuple[float, ...]:
+        return (self.fast, self.slow, self.rsi_period, self.rsi_filter,
+                self.trail_pct, self.fee, self.start_cash)
+
     @staticmethod
     def grid(fee: float = 0.001) -> list[dict[str, float | int]]:
         """Return a grid of parameter combinations for optimisation."""
@@ -176,6 +212,9 @@ class SMACross(StrategyBase):
 class DonchianBreakout(StrategyBase):
     """Donchian channel breakout strategy with ATR‑based trailing stops."""
 
+    _kernel_name = "donchian"
+    _supports_reset = True
+
     def __init__(
         self,
         sid: int,
@@ -194,25 +233,37 @@ class DonchianBreakout(StrategyBase):
 
     def _after_reset(self) -> None:
         self.trailing: float | None = None
+        self._k_dc_high = self._bus.register("high_max", self.ch)
+        self._k_exit_low = self._bus.register("low_min", self.exit_ch)
+        self._k_atr = self._bus.register("atr", self.atr_n)
+        self._dc_high_now = self._dc_high_prev = math.nan
+        self._exit_low_now = math.nan
+        self._atr_now = math.nan
+
+    def _update_indicators(self, price: float, high: float, low: float) -> None:
+        bus = self._bus
+        self._dc_high_prev, self._dc_high_now = self._dc_high_now, bus[self._k_dc_high]
+        self._exit_low_now = bus[self._k_exit_low]
+        self._atr_now = bus[self._k_atr]
 
     def _decide(self, ts: pd.Timestamp, price: float, close: pd.Series, df_full: pd.DataFrame | None = None) -> str | None:
-        if df_full is None or len(df_full) < max(self.ch, self.exit_ch) + 2:
+        if df_full is None or self._bars_seen < max(self.ch, self.exit_ch) + 2:
             return None
-        dc_high = df_full["high"].rolling(self.ch).max()
-        exit_low = df_full["low"].rolling(self.exit_ch).min()
-        _atr = atr(df_full, self.atr_n)
         # Entry on channel breakout
         if self.position == 0:
-            if df_full["close"].iloc[-1] > dc_high.iloc[-2]:
-                self.trailing = price - self.atr_mult * _atr.iloc[-1]
+            if price > self._dc_high_prev:
+                self.trailing = price - self.atr_mult * self._atr_now
                 return "BUY"
         else:
-            self.trailing = max(self.trailing or -np.inf, price - self.atr_mult * _atr.iloc[-1])
-            if df_full["close"].iloc[-1] < exit_low.iloc[-1] or price < self.trailing:
+            self.trailing = max(self.trailing or -np.inf, price - self.atr_mult * self._atr_now)
+            if price < self._exit_low_now or price < self.trailing:
                 self.trailing = None
                 return "SELL"
         return None
 
+    def _kernel_params(self) -> tuple[float, ...]:
+        return (self.ch, self.exit_ch, self.atr_n, self.atr_mult, self.fee, self.start_cash)
+
     @staticmethod
     def grid(fee: float = 0.001) -> list[dict[str, float | int]]:
         """Return a grid of parameter combinations for optimisation."""
@@ -237,6 +288,9 @@ class BollingerReversion(StrategyBase):
     Entry: close < lower_band AND RSI <= rsi_buy
     Exit:  close >= mid_band OR RSI >= rsi_exit OR ATR-stop hit
     """
+    _kernel_name = "bollinger"
+    _supports_reset = True
+
     def __init__(self, sid:int,
                  bb_period=20, bb_dev=2.0,
                  rsi_period=14, rsi_buy=35, rsi_exit=50,
@@ -253,22 +307,34 @@ class BollingerReversion(StrategyBase):
 
     def _after_reset(self):
         self.stop_px = None  # ATR-based protective stop
+        self._k_mid = self._bus.register("sma", self.bb_period)
+        self._k_std = self._bus.register("std", self.bb_period)
+        self._k_rsi = self._bus.register("rsi", self.rsi_period)
+        self._k_atr = self._bus.register("atr", self.atr_n)
+        self._mid_now = self._std_now = self._rsi_now = self._atr_now = math.nan
+        # Bars needed before every indicator _decide reads is defined
+        self._warmup = max(self.bb_period, self.rsi_period, self.atr_n) + 2
+
+    def _update_indicators(self, price, high, low):
+        bus = self._bus
+        self._mid_now = bus[self._k_mid]
+        self._std_now = bus[self._k_std]
+        self._rsi_now = bus[self._k_rsi]
+        self._atr_now = bus[self._k_atr]
 
     def _decide(self, ts, price, close, df_full=None):
-        if df_full is None or len(close) < max(self.bb_period, self.rsi_period, self.atr_n) + 2:
+        if df_full is None or self._bars_seen < self._warmup:
             return None
 
         # Bollinger bands
-        mid = close.rolling(self.bb_period).mean()
-        std = close.rolling(self.bb_period).std(ddof=0)
-        upper = mid + self.bb_dev * std
-        lower = mid - self.bb_dev * std
+        mid = self._mid_now
+        lower = mid - self.bb_dev * self._std_now
 
         # RSI
-        r = rsi(close, self.rsi_period).iloc[-1]
+        r = self._rsi_now
 
         # ATR for protective stop
-        _atr = atr(df_full, self.atr_n).iloc[-1]
+        _atr = self._atr_now
 
         # SELL rules (flatten)
         if self.position > 0:
@@ -277,19 +343,23 @@ class BollingerReversion(StrategyBase):
                 self.stop_px = None
                 return "SELL"
             # exit on reversion or RSI normalization
-            if price >= mid.iloc[-1] or r >= self.rsi_exit:
+            if price >= mid or r >= self.rsi_exit:
                 self.stop_px = None
                 return "SELL"
 
         # BUY rules (fade downside extension)
         else:
-            if price <= lower.iloc[-1] and r <= self.rsi_buy:
+            if price <= lower and r <= self.rsi_buy:
                 # set initial stop below entry by ATR multiple
                 self.stop_px = price - self.atr_mult * _atr if _atr == _atr else None
                 return "BUY"
 
         return None
 
+    def _kernel_params(self):
+        return (self.bb_period, self.bb_dev, self.rsi_period, self.rsi_buy, self.rsi_exit,
+                self.atr_n, self.atr_mult, self.fee, self.start_cash)
+
     @staticmethod
     def grid(fee=0.001):
         return [{"bb_period": bp, "bb_dev": bd,
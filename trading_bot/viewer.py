@@ -6,11 +6,15 @@ dropdowns or radio buttons (depending on Matplotlib version) to select
 a symbol and a strategy. It supports adjusting the trading fee on the fly
 and updates the backtest results accordingly. The viewer remembers the
 selected strategy across symbol changes and recomputes only the current
-symbol when the fee is changed.
+symbol when the fee is changed, on a worker thread so the window stays
+responsive meanwhile.
 """
 
 from __future__ import annotations
 
+import traceback
+from concurrent.futures import Future, ThreadPoolExecutor
+
 import matplotlib.pyplot as plt
 from matplotlib.widgets import TextBox
 
@@ -23,10 +27,9 @@ except Exception:
 
 from typing import List, Tuple, Dict, Any
 
-from .data import fetch_klines
-from .backtest import run_backtest_multi
+from .backtest import run_backtest_multi, run_backtest_symbols
 from .strategies import StrategyBase
-from .plotting import _plot_one
+from .plotting import _ViewerPlot
 
 __all__ = ["interactive_backtest_viewer"]
 
@@ -47,18 +50,21 @@ def interactive_backtest_viewer(
     chosen_specs : list
         List of (StrategyClass, params_dict) pairs to backtest.
     """
-    # Fetch data once for each symbol
-    data: Dict[str, Any] = {sym: fetch_klines(sym, interval=interval, limit=limit) for sym in symbols}
     # Helper to run backtests for a specific fee
     def with_fee(specs: List[Tuple[type, Dict[str, Any]]], fee: float) -> List[Tuple[type, Dict[str, Any]]]:
         return [(Cls, {**params, "fee": fee}) for Cls, params in specs]
 
     current_fee = 0.0  # default fee
-    results: Dict[str, List[StrategyBase]] = {
-        sym: run_backtest_multi(data[sym], with_fee(chosen_specs, current_fee)) for sym in symbols
-    }
+    # Fetch and backtest every symbol once, in parallel worker processes
+    loaded = run_backtest_symbols(symbols, interval, limit, with_fee(chosen_specs, current_fee))
+    if not loaded:
+        raise RuntimeError("No data could be loaded for any symbol")
+    symbols = list(loaded)
+    data: Dict[str, Any] = {sym: df for sym, (df, _) in loaded.items()}
+    results: Dict[str, List[StrategyBase]] = {sym: strats for sym, (_, strats) in loaded.items()}
 
     fig, ax = plt.subplots(figsize=(12, 6))
+    plot = _ViewerPlot(ax)
     fig.subplots_adjust(left=0.08, right=0.75, top=0.9, bottom=0.1)  
     # main plot only takes ~75% width now
 
@@ -121,7 +127,7 @@ def interactive_backtest_viewer(
         idx = current_index()
         idx = max(0, min(idx, len(results[current_sym]) - 1))
         strat = results[current_sym][idx]
-        _plot_one(ax, data[current_sym], strat)
+        plot.draw(data[current_sym], strat)
         fig.suptitle(
             f"{current_sym} — {title_mapping()}  |  fee={current_fee:.4%}", y=0.95
         )
@@ -162,12 +168,44 @@ def interactive_backtest_viewer(
         if abs(new_fee - current_fee) < 1e-9:
             return
         current_fee = new_fee
-        # Recompute only the current symbol with the new fee
-        results[current_sym] = run_backtest_multi(
-            data[current_sym], with_fee(chosen_specs, current_fee)
+        # Recompute only the current symbol with the new fee. A newer fee
+        # supersedes a recomputation that is still pending.
+        if pending["fut"] is not None:
+            pending["fut"].cancel()
+        pending["sym"] = current_sym
+        pending["fut"] = pool.submit(
+            run_backtest_multi, data[current_sym], with_fee(chosen_specs, current_fee)
         )
-        set_strategy_selector(current_index())
+        fig.suptitle(f"{current_sym} — recomputing  |  fee={current_fee:.4%}", y=0.95)
+        fig.canvas.draw_idle()
+        poll_timer.start()
+
+    # The backtest runs on one worker thread; its result is applied on the
+    # main thread by this timer, as Matplotlib is not thread-safe.
+    pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="viewer")
+    pending: Dict[str, Any] = {"fut": None, "sym": None}
+
+    def on_poll() -> None:
+        fut: Future | None = pending["fut"]
+        if fut is None or not fut.done():
+            return
+        pending["fut"] = None
+        poll_timer.stop()
+        try:
+            results[pending["sym"]] = fut.result()
+        except Exception:
+            traceback.print_exc()
+        if pending["sym"] == current_sym:
+            set_strategy_selector(current_index())
         refresh()
+        fig.canvas.draw_idle()
+
+    poll_timer = fig.canvas.new_timer(interval=100)
+    poll_timer.add_callback(on_poll)
+
+    def on_close(_event: Any) -> None:
+        poll_timer.stop()
+        pool.shutdown(wait=False, cancel_futures=True)
 
     # Wire events
     if HAVE_DROPDOWN:
@@ -177,6 +215,7 @@ def interactive_backtest_viewer(
         dd_sym.on_clicked(on_change_sym)
         dd_str.on_clicked(on_change_str)
     fee_box.on_submit(on_fee_submit)
+    fig.canvas.mpl_connect("close_event", on_close)
 
     # Initial draw
     set_strategy_selector(current_index())